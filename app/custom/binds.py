@@ -1,11 +1,29 @@
-from dataclasses import field
-from typing import Any, Generic, TypeVar
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from typing import Any, Generic, Literal, TypeVar
 
 from nicegui import binding
 
 T = TypeVar("T")
 
 
+@dataclass
+class ListChange(Generic[T]):
+    """Change made to an `ObservableListBind`.
+
+    - insert: `items` were inserted at `index`.
+    - remove: `items` were removed from `index`.
+    - move: the item at `index` was moved to `new_index`.
+    - replace: `items` replaced the items starting at `index`.
+    - reset: the whole list changed.
+    """
+
+    kind: Literal["insert", "remove", "move", "replace", "reset"]
+    index: int = 0
+    items: list[T] = field(default_factory=list)
+    new_index: int = 0
+
+
 @binding.bindable_dataclass
 class ListBind(Generic[T]):
     value: list[T] = field(default_factory=list)
@@ -23,6 +41,70 @@ class ListBind(Generic[T]):
         self.value = []
 
 
+@binding.bindable_dataclass
+class ObservableListBind(ListBind[T]):
+    """`ListBind` whose functions change `value` in place and notify subscribers.
+
+    As `value` stays the same list object, these changes do not trigger bindings of
+    `value` (use `ListBind` for that). Instead, the changes are sent to the subscribed
+    listeners (see `sortable.Base.bind_list`).
+    """
+
+    def __post_init__(self) -> None:
+        self._listeners: list[Callable[[ListChange[T]], Any]] = []
+
+    def subscribe(self, callback: Callable[[ListChange[T]], Any]) -> None:
+        self._listeners.append(callback)
+
+    def unsubscribe(self, callback: Callable[[ListChange[T]], Any]) -> None:
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def _notify(self, change: ListChange[T]) -> None:
+        for callback in list(self._listeners):
+            callback(change)
+
+    def replace(self, new_list: list[T]):
+        self.value[:] = new_list
+        self._notify(ListChange("reset"))
+
+    def append(self, element: T):
+        self.value.append(element)
+        self._notify(ListChange("insert", len(self.value) - 1, [element]))
+
+    def extend(self, elements: list[T]):
+        index = len(self.value)
+        self.value.extend(elements)
+        self._notify(ListChange("insert", index, self.value[index:]))
+
+    def insert(self, index: int, element: T):
+        # same index handling as `list.insert`
+        if index < 0:
+            index = max(len(self.value) + index, 0)
+        index = min(index, len(self.value))
+        self.value.insert(index, element)
+        self._notify(ListChange("insert", index, [element]))
+
+    def pop(self, index: int = -1) -> T:
+        index = index if index >= 0 else len(self.value) + index
+        element = self.value.pop(index)
+        self._notify(ListChange("remove", index, [element]))
+        return element
+
+    def move(self, old_index: int, new_index: int):
+        self.value.insert(new_index, self.value.pop(old_index))
+        self._notify(ListChange("move", old_index, new_index=new_index))
+
+    def set(self, index: int, element: T):
+        self.value[index] = element
+        self._notify(ListChange("replace", index, [element]))
+
+    def clear(self):
+        elements = self.value[:]
+        self.value.clear()
+        self._notify(ListChange("remove", 0, elements))
+
+
 @binding.bindable_dataclass
 class TextBind:
     text: str | None
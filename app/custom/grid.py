@@ -1,7 +1,58 @@
-from dataclasses import asdict, dataclass, is_dataclass
-from typing import Literal
-
-from nicegui import ui
+import asyncio
+import functools
+from collections.abc import Mapping
+from dataclasses import asdict, dataclass, fields, is_dataclass
+from operator import attrgetter
+from typing import Any, Literal
+
+from nicegui import background_tasks, events, ui
+from nicegui.json import dumps
+
+from app.custom.props import suspend_updates
+from app.custom.ssp_table import FetchRowsAndCount, PageArgs, PageCache
+
+
+@functools.cache
+def _dataclass_fields(cls: type) -> tuple[tuple[str, ...], Any]:
+    """Field names of the dataclass `cls` and a getter of their values (as tuple)."""
+    names = tuple(field.name for field in fields(cls))
+    if len(names) == 1:
+        return names, lambda obj: (getattr(obj, names[0]),)
+    return names, attrgetter(*names)
+
+
+def row_to_dict(row: Any) -> dict:
+    """Shallow dict of a dataclass row, other rows are returned as is."""
+    if not is_dataclass(row) or isinstance(row, type):
+        return row
+    names, getter = _dataclass_fields(type(row))
+    return dict(zip(names, getter(row)))
+
+
+def rows_to_dicts(rows: list | Mapping[str, Any]) -> list[dict]:
+    """Rows as list of dicts for `rowData`.
+
+    Unlike `dataclasses.asdict`, dataclasses are converted shallowly (nested values are
+    serialized as they are) with the field names looked up once per type.
+    `rows` can also be column oriented, a dict of lists (or NumPy arrays) by field.
+    """
+    if isinstance(rows, Mapping):
+        names = list(rows)
+        columns = [
+            column.tolist() if hasattr(column, "tolist") else column
+            for column in rows.values()
+        ]
+        return [dict(zip(names, values)) for values in zip(*columns)]
+    if not rows or not is_dataclass(rows[0]):
+        return rows
+
+    names, getter = _dataclass_fields(type(rows[0]))
+    return [
+        dict(zip(names, getter(row)))
+        if type(row) is type(rows[0])
+        else row_to_dict(row)
+        for row in rows
+    ]
 
 
 @dataclass()
@@ -52,31 +103,207 @@ class AGTooltipConfig:
     tooltipHideDelay: int = 2000
 
 
+class AGColumns:
+    def __init__(self, columnDefs: list[AGColDef]) -> None:
+        """Column definitions prepared for AG Grid once
+
+        Create it once per layout (like at module level) and pass it as `columnDefs` to every
+        `AGGrid` with this layout, so the `AGColDef`s are not converted again per grid. Each grid
+        still gets its own copy of the definitions in its options. Changing the `AGColDef`s
+        afterwards has no effect.
+
+        Args:
+            columnDefs (list[AGColDef]): column definitions.
+        """
+        self.columnDefs = columnDefs
+        self.grid_column_defs: list[dict] = [colDef.forGrid() for colDef in columnDefs]
+        self.header_checkbox = any(
+            colDef.headerCheckboxSelection for colDef in columnDefs
+        )
+
+        self.primary_index = 0
+        # To use instead of row index
+        # In case `rowDrag` is not set
+        # In case no columns is `pinned`
+        # Below config make sures it defaults to first column or first pinned column be primary
+        if not any(col.rowDrag for col in columnDefs):
+            for ind, col in enumerate(columnDefs):
+                if col.pinned:
+                    self.primary_index = ind
+                    break
+        self.primary_column: str = columnDefs[self.primary_index].field
+
+    @staticmethod
+    @functools.lru_cache(maxsize=256)
+    def of_fields(fields: tuple[str, ...]) -> "AGColumns":
+        """Default columns for rows with these keys (the last 256 key sets are cached)."""
+        return AGColumns([AGColDef(field=field) for field in fields])
+
+
 class AGGrid(ui.aggrid):
     async def get_ordered_selection(self):
-        selected = await self.get_selected_rows()
-        if len(selected) > 1:
-            ordered_row_data = await self.get_client_data()
-            selected = [row for row in ordered_row_data if row in selected]
-        return selected
+        """Selected rows in the order of the grid.
+
+        The selection is collected in the browser, so only the selected rows are sent.
+        """
+        return await self.client.run_javascript(
+            "const rows = [];"
+            f"getElement({self.id}).api.forEachNode((node) => node.isSelected() && rows.push(node.data));"
+            "return rows;"
+        )
 
     async def update_row_data(self, rowData):
+        with suspend_updates(self):
+            self.options["rowData"] = rowData
         await self.run_grid_method("setGridOption", "rowData", rowData)
 
+    def apply_transaction(
+        self,
+        *,
+        add: list | None = None,
+        update: list | None = None,
+        remove: list | None = None,
+    ) -> None:
+        """Add, update and remove rows (matched by the primary column) right away.
+
+        Only the given rows are sent, instead of the whole `rowData`.
+        """
+        transaction = {
+            "add": [row_to_dict(row) for row in add or []],
+            "update": [row_to_dict(row) for row in update or []],
+            "remove": [row_to_dict(row) for row in remove or []],
+        }
+        self._apply_to_row_data(transaction)
+        self.run_grid_method("applyTransaction", transaction)
+
+    def add_rows(self, rows: list) -> None:
+        """Add rows with the next batched transaction."""
+        for row in rows:
+            self._queue("add", row_to_dict(row))
+
+    def update_rows(self, rows: list) -> None:
+        """Update rows with the next batched transaction, the last update of a row wins."""
+        for row in rows:
+            self._queue("update", row_to_dict(row))
+
+    def remove_rows(self, keys: list) -> None:
+        """Remove the rows with these primary column values with the next batched transaction."""
+        for key in keys:
+            self._queue("remove", {self.primary_column: key})
+
+    def _queue(self, kind: Literal["add", "update", "remove"], row: dict) -> None:
+        key = row[self.primary_column]
+        queued = self._transaction.get(key)
+        if queued is None or queued[0] == kind:
+            self._transaction[key] = (kind, row)
+        elif queued[0] == "add":
+            # the client does not know the row yet
+            if kind == "update":
+                self._transaction[key] = ("add", row)
+            else:
+                del self._transaction[key]
+        elif queued[0] == "update":
+            self._transaction[key] = (kind if kind == "remove" else "update", row)
+        elif kind == "add":
+            self._transaction[key] = ("update", row)  # removed and added again
+
+        if self._transaction_task is None or self._transaction_task.done():
+            self._transaction_task = background_tasks.create(
+                self._flush_transaction(), name=f"aggrid {self.id} transaction"
+            )
+
+    async def _flush_transaction(self) -> None:
+        await asyncio.sleep(self.batch_interval)
+        queued, self._transaction = self._transaction, {}
+        transaction: dict[str, list] = {"add": [], "update": [], "remove": []}
+        for kind, row in queued.values():
+            transaction[kind].append(row)
+        self._apply_to_row_data(transaction)
+        self.run_grid_method("applyTransactionAsync", transaction)
+
+    def _apply_to_row_data(self, transaction: dict[str, list]) -> None:
+        """Keep `rowData` in sync with the client (for example when the grid is rendered again).
+
+        The client gets the transaction instead of the whole grid.
+        """
+        row_data: list = self.options["rowData"]
+        with suspend_updates(self):
+            if transaction["update"]:
+                index = {row[self.primary_column]: i for i, row in enumerate(row_data)}
+                for row in transaction["update"]:
+                    i = index.get(row[self.primary_column])
+                    if i is not None:
+                        row_data[i] = row
+            if transaction["remove"]:
+                removed = {row[self.primary_column] for row in transaction["remove"]}
+                row_data[:] = [
+                    row for row in row_data if row[self.primary_column] not in removed
+                ]
+            row_data.extend(transaction["add"])
+
     async def deselect_selection(self):
         await self.run_grid_method("deselectAll")
 
     async def update_new_order(self):
-        await self.update_row_data(await self.get_client_data())
+        """Apply the order of the rows on the client (for example after dragging) to `rowData`.
+
+        Only the row ids are requested, the client already shows this order.
+        """
+        ids = await self.client.run_javascript(
+            "const ids = [];"
+            f"getElement({self.id}).api.forEachNode((node) => ids.push(node.id));"
+            "return ids;"
+        )
+        rows = {str(row[self.primary_column]): row for row in self.options["rowData"]}
+        with suspend_updates(self):
+            self.options["rowData"][:] = [
+                rows[row_id] for row_id in ids if row_id in rows
+            ]
 
     def get_primary_column(self):
         return self.primary_column
 
+    def set_filter(self, filter: str) -> None:
+        """Set the `filter` of `PageArgs` and load the rows again (with `datasource`)."""
+        self.filter = filter
+        self.run_grid_method("purgeInfiniteCache")
+
+    def refresh_blocks(self) -> None:
+        """Remove the cached blocks and load the rows again (with `datasource`)."""
+        self.cache.invalidate()
+        self.run_grid_method("purgeInfiniteCache")
+
+    async def _handle_block_request(self, e: events.GenericEventArguments) -> None:
+        request, start, end = e.args["request"], e.args["start"], e.args["end"]
+        sort_model = e.args["sort_model"]
+        page_args = PageArgs(
+            offset=start,
+            limit=end - start,
+            sort_by=sort_model[0]["colId"] if sort_model else None,
+            descending=bool(sort_model) and sort_model[0]["sort"] == "desc",
+            filter=self.filter,
+        )
+        callback = f"getElement({self.id}).takeBlockRequest({request})"
+        try:
+            result = await self.cache.fetch(page_args, self.datasource)
+        except Exception:
+            self.client.run_javascript(f"{callback}?.failCallback();")
+            raise
+        if result is None:
+            return  # the app is stopping
+        rows, total = result
+        rows = rows_to_dicts(rows)
+        if total is None:
+            total = start + len(rows) if len(rows) < end - start else -1
+        self.client.run_javascript(
+            f"{callback}?.successCallback({dumps(rows)}, {total});"
+        )
+
     def __init__(
         self,
-        rowData: list,
+        rowData: list | dict[str, Any],
         *,
-        columnDefs: list[AGColDef] | None = None,
+        columnDefs: list[AGColDef] | AGColumns | None = None,
         selection: Literal["multiple", "single"] | None = None,
         drag: Literal["multiple", "single"] | None = None,
         hide_header: bool = False,
@@ -84,14 +311,25 @@ class AGGrid(ui.aggrid):
         html_columns: list[int] = [],
         theme: str | None = "balham",
         auto_size_columns: bool = True,
+        batch_interval: float = 0.05,
+        datasource: FetchRowsAndCount | None = None,
+        block_size: int = 100,
+        max_blocks: int | None = None,
+        cache: PageCache | None = None,
     ) -> None:
         """AGGrid Wrapper Class
 
         This will only for nicegui 2.x or until 32.1.0 community version of aggrid is being used.
 
+        With `datasource`, the grid uses the infinite row model instead of `rowData`: rows are loaded in
+        blocks of `block_size` rows while scrolling. `datasource` is called like `fetch_rows_and_count` of
+        `ssp_table.Table` with `ssp_table.PageArgs` (`sort_by` and `descending` from the first sorted
+        column, `filter` from `set_filter`) and blocks are kept in `cache`. The browser keeps at most
+        `max_blocks` blocks. The row transactions and `update_new_order` require `rowData`.
+
         Args:
-            rowData (list): list of rows
-            columnDefs (list[AGColDef] | None, optional): column definitions based on the keys in rowData. If None, columnsDefs autopopulates based on rowData. Defaults to None.
+            rowData (list | dict[str, Any]): list of rows (dicts or dataclasses) or dict of columns (lists or NumPy arrays)
+            columnDefs (list[AGColDef] | AGColumns | None, optional): column definitions based on the keys in rowData. If None, columnsDefs autopopulates based on rowData. Defaults to None.
             selection (Literal["multiple", "single"] | None, optional): whether the rows should be selectable. Defaults to None.
             drag (Literal["multiple", "single"] | None, optional): whether the rows should be draggable. Defaults to None.
             hide_header (bool, optional): whether the header row should be kept hidden. Defaults to False.
@@ -99,29 +337,32 @@ class AGGrid(ui.aggrid):
             html_columns (list[int], optional): list of columns that should be rendered as HTML. Defaults to [].
             theme (str | None, optional): AG Grid theme. Defaults to "balham".
             auto_size_columns (bool, optional): whether to automatically resize columns to fit the grid width. Defaults to True.
+            batch_interval (float, optional): seconds to collect `add_rows`, `update_rows` and `remove_rows` into one transaction. Defaults to 0.05.
+            datasource (Callable[[PageArgs], tuple[list, int | None]] | None, optional): (async) function fetching a block of rows and the total row count. Defaults to None.
+            block_size (int, optional): number of rows per block (with `datasource`). Defaults to 100.
+            max_blocks (int | None, optional): number of blocks kept in the browser (None: all). Defaults to None.
+            cache (PageCache | None, optional): server side cache of blocks, can be shared by grids with the same `datasource`. Defaults to a new PageCache.
         """
+        rowData = rows_to_dicts(rowData)
         if len(rowData) == 0 and columnDefs is None:
             raise ValueError(
                 "rowData and columnDef both can not be empty at the same time."
             )
 
-        if len(rowData) != 0 and is_dataclass(rowData[0]):
-            rowData = [asdict(row) for row in rowData]
-
         if columnDefs is None:
-            columnDefs = [AGColDef(field=col) for col in rowData[0].keys()]
+            columns = AGColumns.of_fields(tuple(rowData[0]))
+        elif isinstance(columnDefs, AGColumns):
+            columns = columnDefs
+        else:
+            columns = AGColumns(columnDefs)
 
         options = {
-            "columnDefs": [colDef.forGrid() for colDef in columnDefs],
+            "columnDefs": columns.grid_column_defs,
             "rowData": rowData,
             "stopEditingWhenCellsLoseFocus": True,
         }
 
-        selection = (
-            "multiple"
-            if any(colDef.headerCheckboxSelection for colDef in columnDefs)
-            else selection
-        )
+        selection = "multiple" if columns.header_checkbox else selection
         # selected to `multiple` if headerCheṭckboxSelection is True for one column
 
         if selection in ("multiple", "single"):
@@ -136,22 +377,14 @@ class AGGrid(ui.aggrid):
             options["rowDragManaged"] = True
             options["rowSelection"] = "multiple"
 
-        primary_col = 0
-        # To use instead of row index
-        # In case `rowDrag` is not set
-        # In case no columns is `pinned`
-        # Below config make sures it defaults to first column or first pinned column be primary
-        if not any([col.rowDrag for col in columnDefs]):
-            if any([col.pinned for col in columnDefs]):
-                for ind, col in enumerate(columnDefs):
-                    if col.pinned:
-                        primary_col = ind
-                        break
-
         if drag in ("multiple", "single"):
-            columnDefs[primary_col].rowDrag = True
+            # copied, the definitions of `columns` are shared with other grids
+            options["columnDefs"] = list(columns.grid_column_defs)
+            options["columnDefs"][columns.primary_index] = options["columnDefs"][
+                columns.primary_index
+            ] | {"rowDrag": True}
 
-        self.primary_column: str = columnDefs[primary_col].field
+        self.primary_column: str = columns.primary_column
         options[":getRowId"] = f"(params) => params.data.{self.primary_column}"
 
         if hide_header:
@@ -161,9 +394,46 @@ class AGGrid(ui.aggrid):
             for key, value in asdict(tooltip_config).items():
                 options[key] = value
 
+        if datasource is not None:
+            del options["rowData"]
+            options["rowModelType"] = "infinite"
+            options["cacheBlockSize"] = block_size
+            if max_blocks is not None:
+                options["maxBlocksInCache"] = max_blocks
+
+        self.batch_interval = batch_interval
+        self.datasource = datasource
+        self.cache = PageCache() if cache is None else cache
+        self.filter: str = ""
+        self._transaction: dict[Any, tuple[str, dict]] = {}
+        self._transaction_task: asyncio.Task | None = None
+
         super().__init__(
             options,
             html_columns=html_columns,
             theme=theme,
             auto_size_columns=auto_size_columns,
         )
+
+        if datasource is not None:
+            # the datasource asks the server for each block and keeps the callbacks until it answers
+            self.options[":datasource"] = f"""({{
+                getRows(params) {{
+                    const grid = getElement({self.id});
+                    grid.blockRequests ??= {{}};
+                    grid.takeBlockRequest ??= (request) => {{
+                        const params = grid.blockRequests[request];
+                        delete grid.blockRequests[request];
+                        return params;
+                    }};
+                    const request = (grid.lastBlockRequest = (grid.lastBlockRequest ?? 0) + 1);
+                    grid.blockRequests[request] = params;
+                    grid.$emit("block-request", {{
+                        request: request,
+                        start: params.startRow,
+                        end: params.endRow,
+                        sort_model: params.sortModel,
+                    }});
+                }},
+            }})"""
+            self.on("block-request", self._handle_block_request)
@@ -1,7 +1,235 @@
+import asyncio
 import os
+import re
+import threading
+import time
+from bisect import bisect_left
+from collections import OrderedDict, deque
+from collections.abc import AsyncIterator, Iterator
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import Any
 
-from nicegui import events, ui
+from nicegui import background_tasks, events, run, ui
+
+from app.custom.props import suspend_updates
+
+
+def _scan_directory(
+    directory: str, cancelled: threading.Event, chunk_size: int
+) -> Iterator[list[tuple[str, str, bool]]]:
+    """Name, path and whether it is a directory of the entries in `directory`, in chunks.
+
+    Uses the file type `os.scandir` already read (no stat per entry), stops early if `cancelled` is set.
+    """
+    chunk = []
+    try:
+        with os.scandir(directory) as iterator:
+            for entry in iterator:
+                if cancelled.is_set():
+                    return
+                try:
+                    is_dir = entry.is_dir()
+                except OSError:
+                    is_dir = False
+                chunk.append((entry.name, entry.path, is_dir))
+                if len(chunk) >= chunk_size:
+                    yield chunk
+                    chunk = []
+    except OSError:
+        pass  # like an empty directory (for example without permission)
+    if chunk:
+        yield chunk
+
+
+def _modified(directory: str) -> int | None:
+    """Modification time of `directory` in ns, None if it can not be cached (yet)."""
+    try:
+        modified = os.stat(directory).st_mtime_ns
+    except OSError:
+        return None
+    # a change within the mtime resolution of the file system would not change it again
+    if time.time_ns() - modified < 2_000_000_000:
+        return None
+    return modified
+
+
+class ListingCache:
+    def __init__(self, *, max_entries: int = 1_000_000) -> None:
+        """Process wide LRU cache of directory listings
+
+        A listing is reused as long as the modification time of the directory is the same
+        (adding, removing or renaming an entry changes it).
+
+        Args:
+            max_entries (int, optional): number of entries (of all listings) to keep, limits the memory. Defaults to 1_000_000.
+        """
+        self.max_entries = max_entries
+        self._listings: OrderedDict[str, tuple[int, list]] = OrderedDict()
+        self._size: int = 0
+        self._lock = threading.Lock()
+
+    def get(self, directory: str, modified: int) -> list[tuple[str, str, bool]] | None:
+        with self._lock:
+            cached = self._listings.get(directory)
+            if cached is None or cached[0] != modified:
+                return None
+            self._listings.move_to_end(directory)
+            return cached[1]
+
+    def set(
+        self, directory: str, modified: int, entries: list[tuple[str, str, bool]]
+    ) -> None:
+        if len(entries) > self.max_entries:
+            return
+        with self._lock:
+            self._pop(directory)
+            self._listings[directory] = (modified, entries)
+            self._size += len(entries)
+            while self._size > self.max_entries:
+                self._pop(next(iter(self._listings)))
+
+    def invalidate(self, directory: str | None = None) -> None:
+        """Remove the listing of `directory` (None: all listings)."""
+        with self._lock:
+            if directory is None:
+                self._listings.clear()
+                self._size = 0
+            else:
+                self._pop(directory)
+
+    def _pop(self, directory: str) -> None:
+        cached = self._listings.pop(directory, None)
+        if cached is not None:
+            self._size -= len(cached[1])
+
+
+listing_cache = ListingCache()
+
+
+def _match_rank(key: str, query: str, fuzzy: re.Pattern) -> int | None:
+    """0: `key` starts with `query`, 1: contains it, 2: contains its characters in order."""
+    if key.startswith(query):
+        return 0
+    if query in key:
+        return 1
+    if fuzzy.search(key):
+        return 2
+    return None
+
+
+def _fuzzy_pattern(query: str) -> re.Pattern:
+    return re.compile(".*?".join(map(re.escape, query)))
+
+
+class _SearchIndex:
+    def __init__(self, rows: list[dict]) -> None:
+        """Rows of a listing sorted by lowercase name, to find the prefix matches by bisection."""
+        self.rows = sorted(rows, key=lambda row: row["key"])
+        self.keys = [row["key"] for row in self.rows]
+
+    def search(self, query: str, limit: int) -> list[tuple[int, dict]]:
+        """Up to `limit` (rank, row) of the rows matching `query`, best matches first."""
+        start = bisect_left(self.keys, query)
+        end = bisect_left(self.keys, query + "\U0010ffff")
+        results = [(0, row) for row in self.rows[start : min(end, start + limit)]]
+        if len(results) == limit:
+            return results
+
+        fuzzy = _fuzzy_pattern(query)
+        others = []
+        for i in (*range(start), *range(end, len(self.rows))):
+            rank = _match_rank(self.keys[i], query, fuzzy)
+            if rank is not None:
+                others.append((rank, self.rows[i]))
+        others.sort(key=lambda result: result[0])
+        return results + others[: limit - len(results)]
+
+
+def _search_tree(
+    directories: list[str],
+    query: str,
+    *,
+    depth: int,
+    deadline: float,
+    show_hidden_files: bool,
+    cancelled: threading.Event,
+    chunk_size: int,
+) -> Iterator[list[tuple[tuple[str, str, bool], int]]]:
+    """Matches of `query` in `directories` and their subdirectories (up to `depth` levels).
+
+    Yields chunks of ((relative name, path, is directory), rank), stops at `deadline` (`time.monotonic`).
+    """
+    fuzzy = _fuzzy_pattern(query)
+    pending = deque(
+        (directory, os.path.basename(directory), 1) for directory in directories
+    )
+    chunk = []
+    while pending and not cancelled.is_set() and time.monotonic() < deadline:
+        directory, relative, level = pending.popleft()
+        try:
+            with os.scandir(directory) as iterator:
+                for entry in iterator:
+                    if cancelled.is_set() or time.monotonic() >= deadline:
+                        break
+                    if not show_hidden_files and entry.name.startswith("."):
+                        continue
+                    try:
+                        is_dir = entry.is_dir()
+                    except OSError:
+                        is_dir = False
+                    name = f"{relative}/{entry.name}"
+                    if is_dir and level < depth:
+                        pending.append((entry.path, name, level + 1))
+                    rank = _match_rank(entry.name.lower(), query, fuzzy)
+                    if rank is not None:
+                        chunk.append(((name, entry.path, is_dir), rank))
+                    if len(chunk) >= chunk_size:
+                        yield chunk
+                        chunk = []
+        except OSError:
+            continue
+    if chunk:
+        yield chunk
+
+
+# stat calls wait on the file system (like NFS), so several batches run in parallel
+_stat_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="picker_stat")
+
+
+def _stat_batch(
+    paths: list[str], cancelled: threading.Event
+) -> list[tuple[int | None, float | None]]:
+    """Size and modification time (None if it failed) of `paths`."""
+    stats = []
+    for path in paths:
+        if cancelled.is_set():
+            break
+        try:
+            stat = os.stat(path)
+        except OSError:
+            stats.append((None, None))
+        else:
+            stats.append((stat.st_size, stat.st_mtime))
+    return stats
+
+
+_SIZE_FORMATTER = """(params) => {
+    if (params.value == null || params.data.is_dir) return "";
+    const units = ["B", "KB", "MB", "GB", "TB"];
+    let size = params.value, unit = 0;
+    while (size >= 1024 && unit < units.length - 1) { size /= 1024; unit++; }
+    return (unit ? size.toFixed(1) : size) + " " + units[unit];
+}"""
+_DATE_FORMATTER = "(params) => params.value == null ? '' : new Date(params.value * 1000).toLocaleString()"
+
+
+# Directories first (after ".."), then by lowercase name, also while rows are still added
+# (descending only reverses the names, AG Grid negates the result)
+_NAME_COMPARATOR = """(valueA, valueB, nodeA, nodeB, isDescending) => {
+    const a = nodeA.data, b = nodeB.data;
+    return (a.rank - b.rank) * (isDescending ? -1 : 1) || (a.key < b.key ? -1 : a.key > b.key ? 1 : 0);
+}"""
 
 
 class local_file_picker(ui.dialog):
@@ -16,6 +244,12 @@ class local_file_picker(ui.dialog):
         allow_file_ext: str | None = None,
         fallback_directory: str = "/",
         is_dark: bool = False,
+        chunk_size: int = 2000,
+        search_depth: int = 0,
+        search_time: float = 2.0,
+        max_results: int = 1000,
+        show_metadata: bool = False,
+        metadata_batch_size: int = 256,
     ) -> None:
         """Local File Picker
 
@@ -31,6 +265,12 @@ class local_file_picker(ui.dialog):
         :param allow_file_ext: Space separated file extension list that are allowed. For example ".png .jpg .jpeg .webp"
         :param fallback_directory: Fallback directory if `directory` does not exist (defaults to `/`).
         :param is_dark: Fallback directory if `directory` does not exist (defaults to `/`).
+        :param chunk_size: Number of entries listed and sent to the grid at once (default: 2000).
+        :param search_depth: Levels of subdirectories the search box also searches (default: 0, only the shown directory).
+        :param search_time: Seconds after which the search of subdirectories stops (default: 2).
+        :param max_results: Maximum number of search results (default: 1000).
+        :param show_metadata: Whether to show size and modification time columns, loaded in the background after the names (default: False).
+        :param metadata_batch_size: Number of files per batch of stat calls (default: 256).
         """
         super().__init__()
 
@@ -54,18 +294,42 @@ class local_file_picker(ui.dialog):
             else tuple(allow_file_ext.split(" "))
         )
 
+        self.chunk_size: int = chunk_size
+        self._listing_task: asyncio.Task | None = None
+        self._listing_cancelled: threading.Event = threading.Event()
+        self.search_depth: int = search_depth
+        self.search_time: float = search_time
+        self.max_results: int = max_results
+        self._row_data: list[dict] = []
+        self._query: str = ""
+        self._index: tuple[int, int, _SearchIndex] | None = None
+        self._search_task: asyncio.Task | None = None
+        self._search_cancelled: threading.Event = threading.Event()
+        self.show_metadata: bool = show_metadata
+        self.metadata_batch_size: int = metadata_batch_size
+
         with self, ui.card():
+            self.search = (
+                ui.input(placeholder="Search", on_change=self._handle_search)
+                .props("dense clearable")
+                .classes("w-full")
+            )
+            self.loading = ui.linear_progress(show_value=False).props("indeterminate")
+            self.loading.visible = False
             self.grid = (
                 ui.aggrid(
                     {
-                        "columnDefs": [{"field": "name", "headerName": "File"}],
+                        "columnDefs": self._column_defs(metadata_loaded=False),
                         "rowSelection": "multiple" if multiple else "single",
+                        ":getRowId": "(params) => params.data.path",
                     },
                     html_columns=[0],
                 )
                 .classes("w-96")
                 .on("cellDoubleClicked", self.handle_double_click)
             )
+            if show_metadata:
+                self.grid.classes(remove="w-96").style("width: 40rem")
             with ui.row().classes("w-full justify-end"):
                 ui.button("New Folder", on_click=self._handle_new_folder)
                 ui.space()
@@ -78,43 +342,309 @@ class local_file_picker(ui.dialog):
         )
         self.update_grid()
 
+    def _handle_value_change(self, value: Any) -> None:
+        super()._handle_value_change(value)
+        if self.value:
+            # the content of a closed dialog is removed and the grid is created again from its
+            # props, which transactions and `setGridOption` calls did not change
+            self.grid.update()
+
     def update_grid(self) -> None:
-        paths = list(self.path.glob("*"))
+        """List `self.path` in the background, a listing that is still running is cancelled."""
+        self._cancel_search()
+        self._query = ""
+        self.search.value = ""
+        if self._listing_task is not None and not self._listing_task.done():
+            self._listing_cancelled.set()
+            self._listing_task.cancel()
+        self._listing_cancelled = threading.Event()
+        self._listing_task = background_tasks.create(
+            self._update_grid(self.path, self._listing_cancelled),
+            name="local_file_picker listing",
+        )
+
+    async def _update_grid(self, path: Path, cancelled: threading.Event) -> None:
+        """List `path` chunk by chunk.
+
+        While the dialog is open, each chunk is filtered and added to the grid with a transaction
+        (the grid keeps the rows sorted), instead of sending all rows at once.
+        """
+        row_data = []
+        if (self.upper_limit is None and path != path.parent) or (
+            self.upper_limit is not None and path != self.upper_limit
+        ):
+            row_data.append(
+                {
+                    "name": "📁 <strong>..</strong>",
+                    "path": str(path.parent),
+                    "is_dir": True,
+                    "rank": 0,
+                    "key": "",
+                }
+            )
+        with suspend_updates(self.grid):
+            self.grid.options["rowData"] = row_data
+            self.grid.options["columnDefs"] = self._column_defs(metadata_loaded=False)
+        self.grid.update()
+        # NiceGUI 3 stores a copy, the rows are kept in the one of the options
+        row_data = self._row_data = self.grid.options["rowData"]
+
+        self.loading.visible = True
+        try:
+            async for chunk in self._list_directory(str(path), cancelled):
+                rows = self._rows(chunk)
+                with suspend_updates(self.grid):
+                    row_data.extend(rows)
+                if self.value and rows and not self._query:
+                    self.grid.run_grid_method("applyTransactionAsync", {"add": rows})
+        finally:
+            if not cancelled.is_set():
+                self.loading.visible = False
+        if cancelled.is_set():
+            return  # another directory was opened meanwhile
+
+        with suspend_updates(self.grid):
+            row_data.sort(key=lambda row: (row["rank"], row["key"]))
+        if not self.value and not self._query:
+            self.grid.update()  # not shown yet, all rows are sent when it opens
+        if self.show_metadata:
+            await self._load_metadata(row_data, cancelled)
+
+    def _column_defs(self, *, metadata_loaded: bool) -> list[dict]:
+        column_defs = [
+            {
+                "field": "name",
+                "headerName": "File",
+                "sort": "asc",
+                "sortable": True,
+                # never unsorted, the rows are added in the order of the listing
+                "sortingOrder": ["asc", "desc"],
+                ":comparator": _NAME_COMPARATOR,
+                # like `html_columns`, which only applies when the grid is created
+                ":cellRenderer": "(params) => params.value ? params.value : ''",
+            }
+        ]
+        if self.show_metadata:
+            # sortable once all values are there
+            column_defs += [
+                {
+                    "field": "size",
+                    "headerName": "Size",
+                    "width": 100,
+                    "sortable": metadata_loaded,
+                    "sortingOrder": ["asc", "desc"],
+                    ":valueFormatter": _SIZE_FORMATTER,
+                },
+                {
+                    "field": "modified",
+                    "headerName": "Modified",
+                    "sortable": metadata_loaded,
+                    "sortingOrder": ["asc", "desc"],
+                    ":valueFormatter": _DATE_FORMATTER,
+                },
+            ]
+        return column_defs
+
+    async def _load_metadata(
+        self, row_data: list[dict], cancelled: threading.Event
+    ) -> None:
+        """Stat the entries in batches in `_stat_pool` and update their rows as batches finish.
+
+        `row_data` is the listing (the `rowData` of the options unless search results are shown),
+        so the values are kept when the grid is rendered again.
+        """
+        rows = [row for row in row_data if row["rank"] != 0]
+        loop = asyncio.get_running_loop()
+        batches = {
+            loop.run_in_executor(
+                _stat_pool,
+                _stat_batch,
+                [row["path"] for row in batch],
+                cancelled,
+            ): batch
+            for batch in (
+                rows[start : start + self.metadata_batch_size]
+                for start in range(0, len(rows), self.metadata_batch_size)
+            )
+        }
+        pending = set(batches)
+        try:
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                if cancelled.is_set():
+                    return
+                updated = []
+                with suspend_updates(self.grid):
+                    for future in done:
+                        for row, (size, modified) in zip(
+                            batches[future], future.result()
+                        ):
+                            row["size"] = size
+                            row["modified"] = modified
+                            updated.append(row)
+                if self.value and not self._query:
+                    self.grid.run_grid_method(
+                        "applyTransactionAsync", {"update": updated}
+                    )
+        finally:
+            for future in pending:
+                future.cancel()
+
+        column_defs = self._column_defs(metadata_loaded=True)
+        with suspend_updates(self.grid):
+            self.grid.options["columnDefs"] = column_defs
+        if self.value:
+            self.grid.run_grid_method("setGridOption", "columnDefs", column_defs)
+        else:
+            self.grid.update()
+
+    async def _list_directory(
+        self, directory: str, cancelled: threading.Event
+    ) -> AsyncIterator[list[tuple[str, str, bool]]]:
+        """Entries of `directory` in chunks, from `listing_cache` if it did not change."""
+        modified = await run.io_bound(_modified, directory)
+        entries = None if modified is None else listing_cache.get(directory, modified)
+        if entries is not None:
+            for start in range(0, len(entries), self.chunk_size):
+                yield entries[start : start + self.chunk_size]
+                await asyncio.sleep(0)  # let other tasks run between chunks
+            return
+
+        entries = []
+        chunks = _scan_directory(directory, cancelled, self.chunk_size)
+        while chunk := await run.io_bound(next, chunks, []):
+            entries.extend(chunk)
+            yield chunk
+        # None instead of [] if the app is stopping
+        if chunk == [] and modified is not None and not cancelled.is_set():
+            listing_cache.set(directory, modified, entries)
+
+    def _rows(self, entries: list[tuple[str, str, bool]]) -> list[dict]:
+        """Rows of the entries that pass the filters."""
         if not self.show_hidden_files:
-            paths = [p for p in paths if not p.name.startswith(".")]
+            entries = [e for e in entries if not e[0].startswith(".")]
         if len(self.allow_file_ext) != 0:
-            paths = [
-                p for p in paths if (p.name.endswith(self.allow_file_ext) or p.is_dir())
+            entries = [
+                e for e in entries if (e[0].endswith(self.allow_file_ext) or e[2])
             ]
         elif self.show_dir_only:
-            paths = [p for p in paths if p.is_dir()]
-        paths.sort(key=lambda p: p.name.lower())
-        paths.sort(key=lambda p: not p.is_dir())
-
-        self.grid.options["rowData"] = [
+            entries = [e for e in entries if e[2]]
+        return [
             {
-                "name": f"📁 <strong>{p.name}</strong>"
-                if p.is_dir()
-                else f"📄 {p.name}",
-                "path": str(p),
+                "name": f"📁 <strong>{name}</strong>" if is_dir else f"📄 {name}",
+                "path": entry_path,
+                "is_dir": is_dir,
+                "rank": 1 if is_dir else 2,
+                "key": name.lower(),
             }
-            for p in paths
+            for name, entry_path, is_dir in entries
         ]
-        if (self.upper_limit is None and self.path != self.path.parent) or (
-            self.upper_limit is not None and self.path != self.upper_limit
+
+    def _cancel_search(self) -> None:
+        if self._search_task is not None and not self._search_task.done():
+            self._search_cancelled.set()
+            self._search_task.cancel()
+
+    def _handle_search(self, e: events.ValueChangeEventArguments) -> None:
+        query = (e.value or "").strip().lower()
+        if query == self._query:
+            return
+        self._cancel_search()
+        self._search_cancelled = threading.Event()
+        self._search_task = background_tasks.create(
+            self._search(query, self._search_cancelled),
+            name="local_file_picker search",
+        )
+
+    async def _search(self, query: str, cancelled: threading.Event) -> None:
+        """Show the rows matching `query`, then add the matches in subdirectories as they are found."""
+        await asyncio.sleep(0.2)  # debounce typing
+        self._query = query
+        if not query:
+            await self._show_rows(self._row_data, cancelled)
+            return
+
+        index = await self._search_index()
+        results = await run.io_bound(index.search, query, self.max_results)
+        if cancelled.is_set() or results is None:
+            return
+        await self._show_rows(
+            [row | {"rank": rank + 1} for rank, row in results], cancelled
+        )
+        rows = self.grid.options["rowData"]
+        if (
+            cancelled.is_set()
+            or self.search_depth == 0
+            or len(rows) >= self.max_results
         ):
-            self.grid.options["rowData"].insert(
-                0,
-                {
-                    "name": "📁 <strong>..</strong>",
-                    "path": str(self.path.parent),
-                },
+            return
+
+        self.loading.visible = True
+        matches = _search_tree(
+            [row["path"] for row in self._row_data if row["rank"] == 1],
+            query,
+            depth=self.search_depth,
+            deadline=time.monotonic() + self.search_time,
+            show_hidden_files=self.show_hidden_files,
+            cancelled=cancelled,
+            chunk_size=self.chunk_size,
+        )
+        try:
+            while chunk := await run.io_bound(next, matches, None):
+                found = []
+                for entry, rank in chunk:
+                    for row in self._rows([entry]):
+                        found.append(row | {"rank": rank + 1})
+                found = found[: self.max_results - len(rows)]
+                with suspend_updates(self.grid):
+                    rows.extend(found)
+                if self.value and found:
+                    self.grid.run_grid_method("applyTransactionAsync", {"add": found})
+                if len(rows) >= self.max_results:
+                    break
+        finally:
+            if not cancelled.is_set():
+                self.loading.visible = False
+
+    async def _show_rows(self, rows: list[dict], cancelled: threading.Event) -> None:
+        """Make `rows` the `rowData` of the grid.
+
+        While the dialog is open, they are sent in chunks of `chunk_size` (the first one replaces the
+        rows of the grid, the others are added with transactions), instead of all rows at once.
+        """
+        with suspend_updates(self.grid):
+            self.grid.options["rowData"] = rows
+        if not self.value:
+            self.grid.update()
+            return
+
+        rows = list(rows)  # rows added meanwhile are sent with their own transactions
+        self.grid.run_grid_method("setGridOption", "rowData", rows[: self.chunk_size])
+        for start in range(self.chunk_size, len(rows), self.chunk_size):
+            await asyncio.sleep(0)
+            if cancelled.is_set():
+                return
+            self.grid.run_grid_method(
+                "applyTransactionAsync",
+                {"add": rows[start : start + self.chunk_size]},
             )
-        self.grid.update()
+
+    async def _search_index(self) -> _SearchIndex:
+        """Index of the current listing, built again when the listing changed."""
+        rows = self._row_data
+        if self._index is None or self._index[:2] != (id(rows), len(rows)):
+            listing = [row for row in rows if row["rank"] != 0]
+            index = await run.io_bound(_SearchIndex, listing)
+            if index is None:
+                return _SearchIndex([])  # the app is stopping
+            self._index = (id(rows), len(rows), index)
+        return self._index[2]
 
     def handle_double_click(self, e: events.GenericEventArguments) -> None:
         self.path = Path(e.args["data"]["path"])
-        if self.path.is_dir():
+        if e.args["data"]["is_dir"]:
             self.update_grid()
         else:
             self.submit([str(self.path)])
@@ -125,6 +655,7 @@ class local_file_picker(ui.dialog):
             try:
                 new_path = os.path.join(str(self.path), i.value)
                 os.mkdir(new_path)
+                listing_cache.invalidate(str(self.path))
                 self.path = Path(new_path)
                 self.update_grid()
             except Exception as e:
@@ -0,0 +1,12 @@
+from contextlib import AbstractContextManager, nullcontext
+
+from nicegui.element import Element
+
+
+def suspend_updates(element: Element) -> AbstractContextManager:
+    """Change the props of `element` without sending the whole element to the client.
+
+    NiceGUI 3 observes the props and updates the element on every change, NiceGUI 2 does not.
+    """
+    suspend = getattr(element.props, "suspend_updates", None)
+    return nullcontext() if suspend is None else suspend()
@@ -12,6 +12,7 @@ export default {
   `,
     props: {
         group: String,
+        multiDrag: Boolean,
     },
     mounted() {
         if (this.group === 'None') {
@@ -23,12 +24,23 @@ export default {
             // Using a handle would more secure as only elements with the class drop_handle can be moved.
             // handle: ".drop_handle",
             ghostClass: 'opacity-50',
-            onEnd: (evt) => this.$emit("item-drop", {
-                new_index: evt.newIndex,
-                old_index: evt.oldIndex,
-                new_list: parseInt(evt.to.id.slice(1)),
-                old_list: parseInt(evt.from.id.slice(1)),
-            }),
+            multiDrag: this.multiDrag,
+            selectedClass: 'ring-2',
+            onEnd: (evt) => {
+                const args = {
+                    new_index: evt.newIndex,
+                    old_index: evt.oldIndex,
+                    new_list: parseInt(evt.to.id.slice(1)),
+                    old_list: parseInt(evt.from.id.slice(1)),
+                };
+                // With MultiDrag, all selected items are sent in a single event
+                if (evt.items && evt.items.length > 1) {
+                    args.old_indices = evt.oldIndicies.map((item) => item.index);
+                    args.new_indices = evt.newIndicies.map((item) => item.index);
+                    evt.items.forEach((item) => Sortable.utils.deselect(item));
+                }
+                this.$emit("item-drop", args);
+            },
         });
     },
     methods: {
@@ -1,9 +1,12 @@
 from typing import Any, Callable, Literal, Self, override
 
+from nicegui.element import Element
 from nicegui.elements.mixins.disableable_element import DisableableElement
 from nicegui.elements.mixins.value_element import ValueElement
 from nicegui.events import GenericEventArguments
 
+from app.custom.binds import ListChange, ObservableListBind
+
 
 class Base(
     ValueElement,
@@ -11,7 +14,8 @@ class Base(
     component="sortable.js",
     dependencies=["sortable.min.js"],
 ):
-    sortable_list: dict[int, Self] = {}
+    sortable_list: dict[str, dict[int, Self]] = {}
+    """Sortables of each client (by client id), removed again when deleted."""
 
     def __init__(
         self,
@@ -19,6 +23,8 @@ class Base(
         value: list[dict[str, Any]] | None = None,
         class_obj: type,
         group: str | None = None,
+        key: str | None = None,
+        multi_drag: bool = False,
         on_drop: Callable | None = None,
     ) -> None:
         """Sortable Base Elemenmt
@@ -32,18 +38,31 @@ class Base(
 
         Using bindable list for value will automatically reflect the changes in value.
         Or you can still use the `.bind_value_to` function as well.
+        Use `bind_list` with an `ObservableListBind` so that changes made via its functions
+        only create/remove/move the affected children.
+
+        If `key` is given, a value change only creates, deletes or moves the children
+        whose item changed (matched by `item[key]`) instead of rebuilding every child.
+
+        If `multi_drag` is True, items can be selected by clicking on them and dragged together.
+        All selected items are moved in one `item-drop` event (see `_handle_on_drop`).
 
         Args:
             class_obj (type): type of class the children should be.
             value (list[Any], optional): list of keyword args for the `class_obj`. Defaults to None.
             group (str, optional): to group multiple drag drop containers. Defaults to None.
+            key (str, optional): field of the items that identifies them for keyed updates. Defaults to None.
+            multi_drag (bool, optional): whether multiple items can be selected and dragged at once. Defaults to False.
             on_drop (Callable, optional): callback function on `item-drop`. Defaults to None.
         """
         self.class_obj: type = class_obj
+        self.key: str | None = key
+        self._list_bind: ObservableListBind | None = None
 
         super().__init__(value=None, on_value_change=None, throttle=0)
 
         self._props["group"] = group
+        self._props["multi-drag"] = multi_drag
 
         if value is not None:
             self.value: list[dict[str, Any]] = value
@@ -53,7 +72,82 @@ class Base(
         self.on("item-drop", self._handle_on_drop)
         self.on_drop: Callable | None = on_drop
 
-        Base.sortable_list[self.id] = self
+        Base.sortable_list.setdefault(self.client.id, {})[self.id] = self
+
+    @classmethod
+    def registry_size(cls, client_id: str | None = None) -> int:
+        """Number of registered sortables.
+
+        Args:
+            client_id (str, optional): only count the sortables of this client. Defaults to None.
+
+        Returns:
+            int: number of sortables in `sortable_list`.
+        """
+        if client_id is not None:
+            return len(cls.sortable_list.get(client_id, {}))
+        return sum(len(sortables) for sortables in cls.sortable_list.values())
+
+    def bind_list(self, list_bind: ObservableListBind) -> Self:
+        """Use the list of `list_bind` as value and apply its changes to the children.
+
+        Args:
+            list_bind (ObservableListBind): list bind to use as value.
+
+        Returns:
+            Self: the sortable.
+        """
+        if self._list_bind is not None:
+            self._list_bind.unsubscribe(self._handle_list_change)
+        self._list_bind = list_bind
+        self.value = list_bind.value
+        list_bind.subscribe(self._handle_list_change)
+        return self
+
+    def _handle_list_change(self, change: ListChange) -> None:
+        """Apply a change of the bound `ObservableListBind` to the children.
+
+        `value` is the list of the `ObservableListBind`, so it already contains the change.
+        """
+        children = self.default_slot.children
+        if change.kind == "insert":
+            with self:
+                new_children = [self._create_child(item) for item in change.items]
+            if change.index < len(children) - len(new_children):
+                del children[len(children) - len(new_children) :]
+                children[change.index : change.index] = new_children
+            self.update()
+        elif change.kind == "remove":
+            for child in children[change.index : change.index + len(change.items)]:
+                self.remove(child)
+        elif change.kind == "move":
+            children.insert(change.new_index, children.pop(change.index))
+            self.update()
+        elif change.kind == "replace":
+            old_children = children[change.index : change.index + len(change.items)]
+            with self:
+                new_children = [self._create_child(item) for item in change.items]
+            del children[len(children) - len(new_children) :]
+            children[change.index : change.index + len(old_children)] = new_children
+            self.client.remove_elements(
+                element
+                for child in old_children
+                for element in child.descendants(include_self=True)
+            )
+            self.update()
+        else:
+            self.build_list()
+
+    @override
+    def _handle_delete(self) -> None:
+        if self._list_bind is not None:
+            self._list_bind.unsubscribe(self._handle_list_change)
+        sortables = Base.sortable_list.get(self.client.id)
+        if sortables is not None:
+            sortables.pop(self.id, None)
+            if not sortables:
+                del Base.sortable_list[self.client.id]
+        return super()._handle_delete()
 
     @override
     def _handle_enabled_change(self, enabled: bool) -> None:
@@ -81,20 +175,31 @@ class Base(
             - old_index: int
             - new_list: int => converted to Base class
             - old_list: int => converted to Base class
+            - old_indices: list[int] (only when multiple items are dropped)
+            - new_indices: list[int] (only when multiple items are dropped)
 
         Note:
             - `old_list` is the list that emits `item-drop` event and is `self` in this function.
             - `old_list` is not useful in this function but may useful `on_drop` callback.
             - `old_index` is useful this function but not so much in `on_drop` callback.
+            - `old_indices[i]` was dropped at `new_indices[i]`.
         """
-        e.args["new_list"] = Base.sortable_list[e.args["new_list"]]
-        e.args["old_list"] = Base.sortable_list[e.args["old_list"]]
+        sortables = Base.sortable_list[self.client.id]
+        e.args["new_list"] = sortables[e.args["new_list"]]
+        e.args["old_list"] = sortables[e.args["old_list"]]
 
         if self.on_drop is not None:
             self.on_drop(e)
 
         if self.id in (e.args["new_list"].id, e.args["old_list"].id):
-            if e.args["new_list"].id == e.args["old_list"].id:
+            if "old_indices" in e.args:
+                if e.args["new_list"].id == e.args["old_list"].id:
+                    self.internal_multi_drop(
+                        e.args["old_indices"], e.args["new_indices"]
+                    )
+                else:
+                    self.external_multi_drop(e.args)
+            elif e.args["new_list"].id == e.args["old_list"].id:
                 self.internal_drop(e.args["old_index"], e.args["new_index"])
             else:
                 self.external_drop(e.args)
@@ -128,6 +233,47 @@ class Base(
             args["new_list"], args["new_index"]
         )
 
+    def internal_multi_drop(
+        self, old_indices: list[int], new_indices: list[int]
+    ) -> None:
+        """Called when multiple items are dropped in the same list.
+
+        Args:
+            old_indices (list[int]): indices the items were initially.
+            new_indices (list[int]): indices the items were dropped at.
+        """
+        self._multi_drop(self, old_indices, new_indices)
+
+    def external_multi_drop(self, args: dict[str, Any]) -> None:
+        """Called when multiple items are dropped in an another list.
+
+        Args:
+            args (dict[str, Any]): args emitted on `item-drop`.
+            Contains indices and `Base` class.
+        """
+        self._multi_drop(args["new_list"], args["old_indices"], args["new_indices"])
+        args["new_list"].update()
+        self.update()
+
+    def _multi_drop(
+        self, target: Self, old_indices: list[int], new_indices: list[int]
+    ) -> None:
+        """Move the items (and children) at `old_indices` to `new_indices` of `target` in one go."""
+        moves = sorted(zip(old_indices, new_indices), key=lambda move: move[1])
+        taken = {
+            old_index: (self.value[old_index], self.default_slot.children[old_index])
+            for old_index, _ in moves
+        }
+        for old_index in sorted(taken, reverse=True):
+            self.value.pop(old_index)
+            self.default_slot.children.pop(old_index)
+
+        for old_index, new_index in moves:
+            val, child = taken[old_index]
+            child.parent_slot = target.default_slot
+            target.value.insert(new_index, val)
+            target.default_slot.children.insert(new_index, child)
+
     def pop(self, old_index: int) -> dict[str, Any]:
         """To remove an item manually.
 
@@ -161,16 +307,55 @@ class Base(
             self.value.insert(new_index, obj)
 
         with self:
-            self.class_obj(**obj)
+            self._create_child(obj)
         self.default_slot.children[-1].move(target_index=new_index)
 
     def build_list(self):
         """Create children based on value."""
+        if self.key is not None:
+            self._reconcile_list()
+            return
+
         self.clear()
         if self.value is not None:
             with self:
                 for val in self.value:
-                    self.class_obj(**val)
+                    self._create_child(val)
+
+    def _create_child(self, val: dict[str, Any]) -> Element:
+        """Create a child from `val` and remember the item it was built from."""
+        child = self.class_obj(**val)
+        child._sortable_item = dict(val)
+        return child
+
+    def _reconcile_list(self) -> None:
+        """Update children to match value by comparing items via `key`.
+
+        Children with an unchanged item are kept and only moved if needed,
+        changed or new items are created and the rest of the children are removed.
+        """
+        existing: dict[Any, Element] = {}
+        for child in self.default_slot.children:
+            item = getattr(child, "_sortable_item", None)
+            if item is not None:
+                existing.setdefault(item.get(self.key), child)
+
+        children: list[Element] = []
+        for val in self.value or []:
+            child = existing.pop(val.get(self.key), None)
+            if child is None or child._sortable_item != val:
+                with self:
+                    child = self._create_child(val)
+            children.append(child)
+
+        kept = {child.id for child in children}
+        for child in list(self.default_slot.children):
+            if child.id not in kept:
+                self.remove(child)
+
+        if self.default_slot.children != children:
+            self.default_slot.children[:] = children
+            self.update()
 
 
 class Row(Base, default_classes="nicegui-row"):
@@ -180,6 +365,8 @@ class Row(Base, default_classes="nicegui-row"):
         value: list[Any] | None = None,
         class_obj: type,
         group: str | None = None,
+        key: str | None = None,
+        multi_drag: bool = False,
         wrap: bool = True,
         align_items: Literal["start", "end", "center", "baseline", "stretch"]
         | None = None,
@@ -193,6 +380,8 @@ class Row(Base, default_classes="nicegui-row"):
             class_obj (type): type of class the childrens should be.
             value (list[Any], optional): list of keyword args for the `class_obj`. Defaults to None.
             group (str, optional): to group multiple drag drop containers. Defaults to None.
+            key (str, optional): field of the items that identifies them for keyed updates. Defaults to None.
+            multi_drag (bool, optional): whether multiple items can be selected and dragged at once. Defaults to False.
             wrap (bool, optional): whether to wrap the content. Defaults to False.
             align_items (Literal["start", "end", "center", "baseline", "stretch"], optional): alignment of the items in the column. Defaults to None.
             on_drop (Callable, optional): callback function on `item-drop`. Defaults to None.
@@ -201,6 +390,8 @@ class Row(Base, default_classes="nicegui-row"):
             value=value,
             class_obj=class_obj,
             group=group,
+            key=key,
+            multi_drag=multi_drag,
             on_drop=on_drop,
         )
 
@@ -220,6 +411,8 @@ class Column(Base, default_classes="nicegui-column"):
         value: list[Any] | None = None,
         class_obj: type,
         group: str | None = None,
+        key: str | None = None,
+        multi_drag: bool = False,
         wrap: bool = False,
         align_items: Literal["start", "end", "center", "baseline", "stretch"]
         | None = None,
@@ -233,6 +426,8 @@ class Column(Base, default_classes="nicegui-column"):
             class_obj (type): type of class the childrens should be.
             value (list[Any], optional): list of keyword args for the `class_obj`. Defaults to None.
             group (str, optional): to group multiple drag drop containers. Defaults to None.
+            key (str, optional): field of the items that identifies them for keyed updates. Defaults to None.
+            multi_drag (bool, optional): whether multiple items can be selected and dragged at once. Defaults to False.
             wrap (bool, optional): whether to wrap the content. Defaults to False.
             align_items (Literal["start", "end", "center", "baseline", "stretch"], optional): alignment of the items in the column. Defaults to None.
             on_drop (Callable, optional): callback function on `item-drop`. Defaults to None.
@@ -241,6 +436,8 @@ class Column(Base, default_classes="nicegui-column"):
             value=value,
             class_obj=class_obj,
             group=group,
+            key=key,
+            multi_drag=multi_drag,
             on_drop=on_drop,
         )
 
@@ -258,6 +455,8 @@ class Grid(Base, default_classes="nicegui-grid"):
         value: list[Any] | None = None,
         class_obj: type,
         group: str | None = None,
+        key: str | None = None,
+        multi_drag: bool = False,
         rows: int | str | None = None,
         columns: int | str | None = None,
         on_drop: Callable | None = None,
@@ -270,11 +469,20 @@ class Grid(Base, default_classes="nicegui-grid"):
             class_obj (type): type of class the childrens should be.
             value (list[Any], optional): list of keyword args for the `class_obj`. Defaults to None.
             group (str, optional): to group multiple drag drop containers. Defaults to None.
+            key (str, optional): field of the items that identifies them for keyed updates. Defaults to None.
+            multi_drag (bool, optional): whether multiple items can be selected and dragged at once. Defaults to False.
             rows (int, str, optional): number of rows in the grid or a string with the grid-template-rows CSS property (e.g. 'auto 1fr').
             columns (int, str, optional): number of columns in the grid or a string with the grid-template-columns CSS property (e.g. 'auto 1fr')
             on_drop (Callable, optional): callback function on `item-drop`. Defaults to None.
         """
-        super().__init__(value=value, class_obj=class_obj, group=group, on_drop=on_drop)
+        super().__init__(
+            value=value,
+            class_obj=class_obj,
+            group=group,
+            key=key,
+            multi_drag=multi_drag,
+            on_drop=on_drop,
+        )
 
         if isinstance(rows, int):
             self._style["grid-template-rows"] = f"repeat({rows}, minmax(0, 1fr))"
@@ -285,3 +493,105 @@ class Grid(Base, default_classes="nicegui-grid"):
             self._style["grid-template-columns"] = f"repeat({columns}, minmax(0, 1fr))"
         elif isinstance(columns, str):
             self._style["grid-template-columns"] = columns
+
+
+class VirtualColumn(
+    Base, component="sortable_virtual.js", default_style="max-height: 400px"
+):
+    def __init__(
+        self,
+        *,
+        value: list[Any] | None = None,
+        item_template: str,
+        group: str | None = None,
+        item_size: int = 48,
+        buffer: int = 20,
+        on_drop: Callable | None = None,
+    ) -> None:
+        """Sortable Virtual Column Element
+
+        Derived from Sortable Base and Quasar's QVirtualScroll
+
+        Unlike `Column`, no element is created per item. The items are rendered on the client
+        with `item_template` (a slot template, the item is available as `props.item`) and only
+        the rendered items plus `buffer` items on either side are sent to the client.
+        Dropped indices still refer to positions in the whole `value`.
+
+        ```
+        sortable.VirtualColumn(
+            value=[{"label": str(i)} for i in range(50_000)],
+            item_template='<q-item><q-item-section>{{ props.item.label }}</q-item-section></q-item>',
+        ).classes("w-64")
+        ```
+
+        Note:
+            - Items can only be dropped between `VirtualColumn`s (not into other sortables).
+            - The height must be limited (defaults to `max-height: 400px`) for the list to scroll.
+
+        Args:
+            value (list[Any], optional): list of items. Defaults to None.
+            item_template (str): slot template to render an item.
+            group (str, optional): to group multiple drag drop containers. Defaults to None.
+            item_size (int, optional): estimated height of an item in pixels. Defaults to 48.
+            buffer (int, optional): number of items sent before and after the rendered items. Defaults to 20.
+            on_drop (Callable, optional): callback function on `item-drop`. Defaults to None.
+        """
+        self.buffer: int = buffer
+        self._window_start: int = 0
+        self._window_size: int = 2 * buffer
+
+        # items are rendered from `item_template`, so `class_obj` is never instantiated
+        super().__init__(value=value, class_obj=dict, group=group, on_drop=on_drop)
+
+        self._props["item-size"] = item_size
+        self.add_slot("item", item_template)
+        self.on("range", self._handle_range, throttle=0.05)
+
+    @override
+    def build_list(self):
+        """Send the loaded window of value to the client."""
+        total = len(self.value or [])
+        start = min(self._window_start, total)
+
+        self._props["rows"] = (self.value or [])[start : start + self._window_size]
+        self._props["offset"] = start
+        self._props["total"] = total
+        self.update()
+
+    def _handle_range(self, e: GenericEventArguments) -> None:
+        """Load the items rendered by the client (`from` to `to`) with a buffer."""
+        self._window_start = max(0, e.args["from"] - self.buffer)
+        self._window_size = e.args["to"] + 1 + self.buffer - self._window_start
+        self.build_list()
+
+    @override
+    def internal_drop(self, old_index: int, new_index: int) -> None:
+        if old_index != new_index:
+            self.value.insert(new_index, self.value.pop(old_index))
+            self.build_list()
+
+    @override
+    def external_drop(self, args: dict[str, int | Self]) -> None:
+        args["new_list"].value.insert(
+            args["new_index"], self.value.pop(args["old_index"])
+        )
+        args["new_list"].build_list()
+        self.build_list()
+
+    @override
+    def _handle_list_change(self, change: ListChange) -> None:
+        self.build_list()
+
+    @override
+    def pop(self, old_index: int) -> dict[str, Any]:
+        item = self.value.pop(old_index)
+        self.build_list()
+        return item
+
+    @override
+    def insert(self, new_index: int, obj: dict[str, Any]) -> None:
+        if new_index < 0:
+            self.value.append(obj)
+        else:
+            self.value.insert(new_index, obj)
+        self.build_list()
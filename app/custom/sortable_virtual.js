@@ -0,0 +1,72 @@
+import "sortable"; // imports from `sortable.min.js`
+
+export default {
+    template: `
+    <q-virtual-scroll
+      :items-size="total"
+      :items-fn="getItems"
+      :virtual-scroll-item-size="itemSize"
+      @virtual-scroll="onVirtualScroll"
+      v-slot="{ item, index }"
+    >
+      <div :key="index" :data-index="index">
+        <slot name="item" :item="item" :index="index"></slot>
+      </div>
+    </q-virtual-scroll>
+  `,
+    props: {
+        group: String,
+        rows: Array,
+        offset: Number,
+        total: Number,
+        itemSize: Number,
+    },
+    data() {
+        return {
+            from: 0, // absolute index of the first rendered item
+        };
+    },
+    mounted() {
+        this.sortableInstance = Sortable.create(this.$el.querySelector(".q-virtual-scroll__content"), {
+            group: this.group || this.$el.id,
+            animation: 150,
+            ghostClass: 'opacity-50',
+            onEnd: (evt) => {
+                const target = getElement(parseInt(evt.to.parentElement.id.slice(1)));
+                const args = {
+                    new_index: target.from + evt.newIndex,
+                    old_index: parseInt(evt.item.dataset.index),
+                    new_list: parseInt(evt.to.parentElement.id.slice(1)),
+                    old_list: parseInt(evt.from.parentElement.id.slice(1)),
+                };
+                // Put the item back, the new order is rendered once the server sends the new rows
+                evt.item.remove();
+                evt.from.insertBefore(evt.item, evt.from.children[evt.oldIndex] ?? null);
+                this.$emit("item-drop", args);
+            },
+        });
+    },
+    methods: {
+        getItems(from, size) {
+            const items = [];
+            for (let index = from; index < from + size; index++) {
+                items.push(this.rows[index - this.offset] ?? {});
+            }
+            return items;
+        },
+        onVirtualScroll(details) {
+            this.from = details.from;
+            if (details.from < this.offset || details.to >= this.offset + this.rows.length) {
+                this.$emit("range", { from: details.from, to: details.to });
+            }
+        },
+        setDisabled(value) {
+            if (typeof value === "undefined"){
+                value = this.sortableInstance.options.disabled;
+                this.sortableInstance.option('disabled', !value);
+            } else {
+                this.sortableInstance.option('disabled', value);
+            }
+        },
+    },
+};
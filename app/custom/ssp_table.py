@@ -1,13 +1,38 @@
-from collections.abc import Callable
-from dataclasses import asdict, dataclass
-from typing import Any, Callable, Literal
+import asyncio
+import inspect
+import itertools
+import queue
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import (
+    AsyncIterable,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Iterable,
+    Iterator,
+)
+from contextlib import contextmanager
+from dataclasses import asdict, astuple, dataclass, replace
+from typing import Any, Callable, Literal, Self, override
 
-from nicegui import events, ui
+from nicegui import background_tasks, core, events, run, ui
+from nicegui.awaitable_response import AwaitableResponse
 from nicegui.events import (
     Handler,
     TableSelectionEventArguments,
     ValueChangeEventArguments,
 )
+from nicegui.json import dumps
+
+from app.custom.props import suspend_updates
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 
 @dataclass
@@ -17,13 +42,493 @@ class PageArgs:
     sort_by: str | None = None
     descending: bool = False
     filter: str = ""
+    after: tuple | None = None
+    before: tuple | None = None
 
     def as_kwargs(self):
         return asdict(self)
 
+    def count_key(self) -> tuple:
+        """Fields that change the total row count (unlike paging and sorting)."""
+        return (self.filter,)
+
+
+async def _call(func: Callable, *args: Any) -> Any:
+    """Await `func` if it is a coroutine function, otherwise run it in a thread.
+
+    The result is awaited as well if it is awaitable (like from `lambda args: fetch(args)`).
+    """
+    if inspect.iscoroutinefunction(func) or inspect.iscoroutinefunction(func.__call__):
+        return await func(*args)
+    result = await run.io_bound(func, *args)
+    if inspect.isawaitable(result):
+        return await result
+    return result
+
+
+async def _chunks(
+    rows: Iterable[dict[str, Any]] | AsyncIterable[dict[str, Any]], size: int
+) -> AsyncIterator[list[dict[str, Any]]]:
+    """Group `rows` into lists of `size` rows, a normal iterator is advanced in a thread."""
+    if isinstance(rows, AsyncIterable):
+        chunk = []
+        async for row in rows:
+            chunk.append(row)
+            if len(chunk) >= size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+    else:
+        iterator = iter(rows)
+        while chunk := await run.io_bound(
+            lambda: list(itertools.islice(iterator, size))
+        ):
+            yield chunk
+
+
+FetchRowsAndCount = Callable[
+    [PageArgs],
+    tuple[list[dict[str, Any]], int | None]
+    | Awaitable[tuple[list[dict[str, Any]], int | None]],
+]
+FetchCount = Callable[[PageArgs], int | Awaitable[int]]
+StreamRows = Callable[
+    [PageArgs], Iterable[dict[str, Any]] | AsyncIterable[dict[str, Any]]
+]
+
+
+class PageCache:
+    def __init__(self, *, max_pages: int = 128, ttl: float | None = 60) -> None:
+        """LRU cache of pages fetched by `Table`
+
+        Pages are keyed by all fields of `PageArgs`. A cache can be shared by multiple tables
+        (for example all clients showing the same data) as long as they use the same `fetch_rows_and_count`.
+
+        Args:
+            max_pages (int, optional): number of pages to keep. Defaults to 128.
+            ttl (float | None, optional): seconds after which a page is fetched again (None: never). Defaults to 60.
+        """
+        self.max_pages = max_pages
+        self.ttl = ttl
+        self._pages: OrderedDict[tuple, tuple[float, Any]] = OrderedDict()
+        self._pending: dict[tuple, asyncio.Task] = {}
+        self._generation: int = 0
+
+    def __len__(self) -> int:
+        return len(self._pages)
+
+    def get(self, page_args: PageArgs) -> Any | None:
+        """Cached result of `page_args` or None if it is not cached (or expired)."""
+        key = astuple(page_args)
+        if key not in self._pages:
+            return None
+        created, result = self._pages[key]
+        if self.ttl is not None and time.monotonic() - created > self.ttl:
+            del self._pages[key]
+            return None
+        self._pages.move_to_end(key)
+        return result
+
+    def set(self, page_args: PageArgs, result: Any) -> None:
+        key = astuple(page_args)
+        self._pages[key] = (time.monotonic(), result)
+        self._pages.move_to_end(key)
+        while len(self._pages) > self.max_pages:
+            self._pages.popitem(last=False)
+
+    def invalidate(self, filter: str | None = None) -> None:
+        """Remove cached pages.
+
+        Args:
+            filter (str | None, optional): only remove pages with this filter (None: all pages). Defaults to None.
+        """
+        self._generation += 1
+        if filter is None:
+            self._pages.clear()
+        else:
+            for key in [key for key in self._pages if PageArgs(*key).filter == filter]:
+                del self._pages[key]
+
+    async def fetch(
+        self, page_args: PageArgs, fetch_rows_and_count: FetchRowsAndCount
+    ) -> Any:
+        """Get the page from the cache or fetch it.
+
+        A fetch of the same page that is already running is shared instead of starting another one.
+        """
+        result = self.get(page_args)
+        if result is not None:
+            return result
+
+        key = astuple(page_args)
+        if key not in self._pending:
+            self._pending[key] = background_tasks.create(
+                self._fetch(key, page_args, fetch_rows_and_count),
+                name="ssp_table page cache fetch",
+            )
+        # shielded, so a cancelled table fetch still fills the cache for the others
+        return await asyncio.shield(self._pending[key])
+
+    async def _fetch(
+        self, key: tuple, page_args: PageArgs, fetch_rows_and_count: FetchRowsAndCount
+    ) -> Any:
+        generation = self._generation
+        try:
+            result = await _call(fetch_rows_and_count, page_args)
+        finally:
+            self._pending.pop(key, None)
+        if result is not None and generation == self._generation:
+            self.set(page_args, result)
+        return result
+
+
+class ColumnarRows:
+    def __init__(
+        self,
+        rows: list[dict[str, Any]],
+        *,
+        search_columns: list[str] | None = None,
+        max_cached: int = 32,
+    ) -> None:
+        """In-memory rows usable as `fetch_rows_and_count`
+
+        Stores the rows column-wise in NumPy arrays, so filtering, sorting and slicing are vectorized
+        instead of looping over every row per request. Only the rows of the requested page are turned
+        back into dicts. Requires the `numpy` extra.
+
+        The filter is a case insensitive substring match over `search_columns` (lowercase copies are
+        made once). Sort orders of each column and the matches of recent filters are cached, and a
+        filter containing a cached filter (like typing one more letter) only searches the cached matches.
+
+        Values of a column should have the same type (sorting mixed types or None fails).
+        Paging uses `offset` (slicing an array is cheap), `after`/`before` of keyset pagination are ignored.
+
+        Args:
+            rows (list[dict[str, Any]]): rows of the table, all with the same keys.
+            search_columns (list[str] | None, optional): fields searched by the filter (None: all). Defaults to None.
+            max_cached (int, optional): number of filter results (and sort orders) to cache. Defaults to 32.
+        """
+        if np is None:
+            raise ImportError(
+                'ColumnarRows requires numpy (pip install "nicegui-custom-elements[numpy]")'
+            )
+        self.search_columns = search_columns
+        self.max_cached = max_cached
+        self._lock = threading.Lock()
+        self.set_rows(rows)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def set_rows(self, rows: list[dict[str, Any]]) -> None:
+        """Replace all rows (clears the cached filters and sort orders).
+
+        Pages already cached by a `PageCache` must be invalidated as well, see `Table.invalidate_cache`.
+        """
+        fields = list(rows[0]) if rows else []
+        columns = {field: np.array([row[field] for row in rows]) for field in fields}
+        search = [
+            np.char.lower(columns[field].astype(str))
+            for field in (self.search_columns or fields)
+        ]
+        with self._lock:
+            self.fields = fields
+            self._columns = columns
+            self._search = search
+            self._size = len(rows)
+            self._sort_orders: dict[str, np.ndarray] = {}
+            self._matches: OrderedDict[str, np.ndarray] = OrderedDict()
+            self._orders: OrderedDict[tuple, np.ndarray] = OrderedDict()
+
+    def __call__(self, page_args: PageArgs) -> tuple[list[dict[str, Any]], int]:
+        order = self._order(page_args.filter, page_args.sort_by, page_args.descending)
+        if page_args.limit == 0:
+            page = order
+        else:
+            page = order[page_args.offset : page_args.offset + page_args.limit]
+        values = [self._columns[field][page].tolist() for field in self.fields]
+        return [dict(zip(self.fields, row)) for row in zip(*values)], len(order)
+
+    def _order(self, filter: str, sort_by: str | None, descending: bool) -> Any:
+        """Indices of the rows matching `filter` in the order of `sort_by`."""
+        key = (filter, sort_by, descending)
+        with self._lock:
+            if key in self._orders:
+                self._orders.move_to_end(key)
+                return self._orders[key]
+
+        if sort_by in self._columns:
+            order = self._sort_order(sort_by)
+            if descending:
+                order = order[::-1]
+        else:
+            order = np.arange(self._size)
+        if filter:
+            mask = np.zeros(self._size, dtype=bool)
+            mask[self._filter(filter.lower())] = True
+            order = order[mask[order]]
+
+        with self._lock:
+            self._cache(self._orders, key, order)
+        return order
+
+    def _sort_order(self, sort_by: str) -> Any:
+        with self._lock:
+            order = self._sort_orders.get(sort_by)
+        if order is None:
+            order = np.argsort(self._columns[sort_by], kind="stable")
+            with self._lock:
+                self._sort_orders[sort_by] = order
+        return order
+
+    def _filter(self, filter: str) -> Any:
+        """Indices of the rows containing `filter` (lowercase) in one of the search columns."""
+        with self._lock:
+            # matches of a contained filter are a superset, only those need to be searched
+            known = max(
+                (known for known in self._matches if known in filter),
+                key=len,
+                default=None,
+            )
+            indices = None if known is None else self._matches[known]
+        if known == filter:
+            return indices
+
+        found = np.zeros(self._size if indices is None else len(indices), dtype=bool)
+        for column in self._search:
+            values = column if indices is None else column[indices]
+            found |= np.char.find(values, filter) >= 0
+        matches = np.flatnonzero(found) if indices is None else indices[found]
+
+        with self._lock:
+            self._cache(self._matches, filter, matches)
+        return matches
+
+    def _cache(self, cache: OrderedDict, key: Any, value: Any) -> None:
+        cache[key] = value
+        cache.move_to_end(key)
+        while len(cache) > self.max_cached:
+            cache.popitem(last=False)
+
+
+class ConnectionPool:
+    def __init__(self, connect: Callable[[], Any], *, size: int = 4) -> None:
+        """Reuses up to `size` DB-API connections instead of connecting per request
+
+        Args:
+            connect (Callable[[], Any]): function creating a new connection.
+            size (int, optional): maximum number of connections. Defaults to 4.
+        """
+        self.connect = connect
+        self.size = size
+        self._idle: queue.LifoQueue = queue.LifoQueue()
+        self._created: int = 0
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def connection(self) -> Iterator[Any]:
+        """Borrow a connection, waits for one to be returned if all `size` are in use."""
+        try:
+            connection = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                create = self._created < self.size
+                if create:
+                    self._created += 1
+            if create:
+                try:
+                    connection = self.connect()
+                except BaseException:
+                    with self._lock:
+                        self._created -= 1
+                    raise
+            else:
+                connection = self._idle.get()
+        try:
+            yield connection
+        finally:
+            self._idle.put(connection)
+
+    def close(self) -> None:
+        """Close the idle connections."""
+        while True:
+            try:
+                connection = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            with self._lock:
+                self._created -= 1
+            connection.close()
+
+
+def _quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+class SQLRows:
+    def __init__(
+        self,
+        pool: ConnectionPool,
+        table: str,
+        *,
+        columns: list[str],
+        search_columns: list[str] | None = None,
+        row_key: str = "id",
+        count: bool = True,
+    ) -> None:
+        """SQL table usable as `fetch_rows_and_count`
+
+        Turns `PageArgs` into one parameterized query run on a pooled connection:
+            - `filter` is a `LIKE '%filter%'` over `search_columns`.
+            - `sort_by` and `descending` become `ORDER BY sort_by, row_key`, `sort_by` must be one of `columns`.
+            - `limit` and `offset` become `LIMIT ? OFFSET ?`.
+            - `after` and `before` (keyset pagination of `Table`) become `WHERE (sort_by, row_key) > (?, ?)`,
+              which can use an index on `(sort_by, row_key)` instead of skipping `offset` rows.
+
+        The placeholder is `?` (like `sqlite3`). Keyset pagination needs row value comparisons and
+        sort columns without NULL values. For a cached count, set `count=False` and pass `count` as
+        `fetch_count` to `Table`.
+
+        Args:
+            pool (ConnectionPool): pool of DB-API connections.
+            table (str): table (or view) to select from.
+            columns (list[str]): selected columns, the keys of the row dicts.
+            search_columns (list[str] | None, optional): columns searched by the filter (None: `columns`). Defaults to None.
+            row_key (str, optional): unique column, used as tie breaker when sorting. Defaults to "id".
+            count (bool, optional): whether the total row count is queried with every page. Defaults to True.
+        """
+        self.pool = pool
+        self.table = table
+        self.columns = columns
+        self.search_columns = columns if search_columns is None else search_columns
+        self.row_key = row_key
+        self.with_count = count
+        self._select = f"SELECT {', '.join(map(_quote, columns))} FROM {_quote(table)}"
+
+    @classmethod
+    def sqlite(
+        cls, database: str, table: str, *, pool_size: int = 4, **kwargs: Any
+    ) -> Self:
+        """SQLRows of a SQLite database file, `kwargs` are passed to `SQLRows`."""
+        pool = ConnectionPool(
+            lambda: sqlite3.connect(database, check_same_thread=False), size=pool_size
+        )
+        return cls(pool, table, **kwargs)
+
+    def __call__(self, page_args: PageArgs) -> tuple[list[dict[str, Any]], int | None]:
+        query, params = self._rows_query(page_args)
+        with self.pool.connection() as connection:
+            cursor = connection.cursor()
+            try:
+                cursor.execute(query, params)
+                rows = [dict(zip(self.columns, row)) for row in cursor.fetchall()]
+                total = self._count(cursor, page_args) if self.with_count else None
+            finally:
+                cursor.close()
+        if page_args.before is not None and page_args.after is None:
+            rows.reverse()  # queried in reverse order to get the rows right before
+        return rows, total
+
+    def count(self, page_args: PageArgs) -> int:
+        """Number of rows matching the filter of `page_args`."""
+        with self.pool.connection() as connection:
+            cursor = connection.cursor()
+            try:
+                return self._count(cursor, page_args)
+            finally:
+                cursor.close()
+
+    def _count(self, cursor: Any, page_args: PageArgs) -> int:
+        where, params = self._filter(page_args.filter)
+        cursor.execute(f"SELECT count(*) FROM {_quote(self.table)}{where}", params)
+        return cursor.fetchone()[0]
+
+    def _filter(self, filter: str) -> tuple[str, list]:
+        if not filter or not self.search_columns:
+            return "", []
+        pattern = (
+            "%"
+            + filter.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            + "%"
+        )
+        like = " OR ".join(
+            f"{_quote(column)} LIKE ? ESCAPE '\\'" for column in self.search_columns
+        )
+        return f" WHERE ({like})", [pattern] * len(self.search_columns)
+
+    def _rows_query(self, page_args: PageArgs) -> tuple[str, list]:
+        if page_args.sort_by is not None and page_args.sort_by not in self.columns:
+            raise ValueError(f"can not sort by {page_args.sort_by!r}")
+        order_by = [self.row_key]
+        if page_args.sort_by is not None:
+            order_by.insert(0, page_args.sort_by)
+
+        where, params = self._filter(page_args.filter)
+        descending = page_args.descending
+        cursor = page_args.after
+        if cursor is None and page_args.before is not None:
+            cursor = page_args.before
+            descending = not descending
+        if cursor is not None:
+            keys = ", ".join(map(_quote, order_by))
+            placeholders = ", ".join("?" * len(cursor))
+            keyset = f"({keys}) {'<' if descending else '>'} ({placeholders})"
+            where = f"{where} AND {keyset}" if where else f" WHERE {keyset}"
+            params.extend(cursor)
+
+        direction = " DESC" if descending else ""
+        query = f"{self._select}{where} ORDER BY " + ", ".join(
+            _quote(column) + direction for column in order_by
+        )
+        if page_args.limit > 0:
+            query += " LIMIT ?"
+            params.append(page_args.limit)
+            if cursor is None:
+                query += " OFFSET ?"
+                params.append(page_args.offset)
+        return query, params
+
+
+class DataChanges:
+    def __init__(self) -> None:
+        """Signal to tell subscribed tables that their data changed
+
+        Call `notify` after writing to the backend, optionally with the keys (`row_key`) of the
+        changed rows. It can be called from any thread.
+        """
+        self._listeners: list[Callable[[set | None], Any]] = []
+
+    def subscribe(self, callback: Callable[[set | None], Any]) -> None:
+        self._listeners.append(callback)
+
+    def unsubscribe(self, callback: Callable[[set | None], Any]) -> None:
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def notify(self, keys: Iterable | None = None) -> None:
+        """Signal a change.
+
+        Args:
+            keys (Iterable | None, optional): keys of the updated rows (None: any row, including inserts and deletes). Defaults to None.
+        """
+        keys = None if keys is None else set(keys)
+        try:
+            on_loop = asyncio.get_running_loop() is core.loop
+        except RuntimeError:
+            on_loop = False
+        if on_loop:
+            self._notify(keys)
+        elif core.loop is not None:
+            core.loop.call_soon_threadsafe(self._notify, keys)
+
+    def _notify(self, keys: set | None) -> None:
+        for callback in list(self._listeners):
+            callback(keys)
+
 
 class Table(ui.table):
-    fetch_rows_and_count: Callable[[PageArgs], tuple[list[dict[str, Any]], int]]
+    fetch_rows_and_count: FetchRowsAndCount
 
     def __init__(
         self,
@@ -36,7 +541,18 @@ class Table(ui.table):
         on_select: Handler[TableSelectionEventArguments] | None = None,
         on_pagination_change: Handler[ValueChangeEventArguments] | None = None,
         pagination: int | dict = 10,
-        fetch_rows_and_count: Callable[[PageArgs], tuple[list[dict[str, Any]], int]],
+        fetch_rows_and_count: FetchRowsAndCount,
+        fetch_count: FetchCount | None = None,
+        estimated_count: bool = False,
+        cache: PageCache | None = None,
+        prefetch: bool = False,
+        filter_debounce: float = 0.3,
+        keyset: bool = False,
+        stream_rows: StreamRows | None = None,
+        stream_chunk_size: int = 1000,
+        delta_rows: bool = True,
+        changes: DataChanges | None = None,
+        refresh_interval: float = 1.0,
     ) -> None:
         """Server side pagination table
 
@@ -48,10 +564,36 @@ class Table(ui.table):
             - `limit` and `offset` for limiting rows.
             - `sort_by` and `descending` for sorting.
             - `filter` for filtering.
+            - `after` and `before` for keyset pagination (only if `keyset` is True).
+
+        With `keyset`, going to the next/previous page passes the sort key of the last/first shown row,
+        `(row[sort_by], row[row_key])` or `(row[row_key],)` without sorting, as `after`/`before`.
+        The function should then return the `limit` rows after/before that key in the sort order
+        (ordered as shown) instead of using `offset`, which avoids scanning all skipped rows.
+        Other page changes (first/last page, rows per page, sorting, filter) still use `offset`.
 
         It should return a list of rows (list[dict[str, Any]]) and the total rows (int).
         But it is optional to sort/filter and it can be ignored if you do not use the feature.
 
+        Counting all rows on every page change can be avoided:
+            - `fetch_count` counts the rows separately and is only called again when
+              `PageArgs.count_key()` (the filter) changes. The total returned by `fetch_rows_and_count` is ignored.
+            - `estimated_count` treats the total as an estimate (like table statistics) that is corrected
+              when the last page is reached.
+            - If the total is None, the table only knows whether there is a next page (a full page was returned).
+
+        `fetch_rows_and_count` can be a coroutine function. A normal function is run in a thread,
+        so a slow query does not block the event loop. Rows are fetched in the background (the
+        table shows a loading bar) and a fetch is cancelled if another page is requested before
+        it returns (the result of a function already running in a thread is discarded).
+
+        With a `cache`, pages that were fetched before are shown without calling `fetch_rows_and_count`.
+        `prefetch` additionally fetches the previous and the next page in the background
+        (a `PageCache` is created if no `cache` is given). Use `invalidate_cache` when the data changed.
+
+        Changing `filter` (for example with `bind_filter` or `set_filter`) cancels the running fetch and,
+        once the filter did not change for `filter_debounce` seconds, fetches the first page with the new filter.
+
         `pagination` arg is modified from ui.table to required parameter with default value as 10.
         None was removed since it disables pagination feature (pointless to disable for server side pagination).
 
@@ -59,8 +601,24 @@ class Table(ui.table):
         `pagination` as 0 must be configured in `fetch_rows_and_count` to get all rows.
         If not configured, you will get `No data available` in the table (as rows is empty with limit 0).
 
+        Alternatively, `stream_rows` is used for `All`. It is a (async) generator function yielding rows,
+        which are appended to the table in chunks of `stream_chunk_size` rows. The next chunk is only
+        read once the client received the previous one, so each message stays small. The server still
+        keeps all streamed rows (to render the table again), so only use it for results that fit in memory.
+
+        With `delta_rows`, a new page is compared with the shown rows by `row_key` and only the new or
+        changed rows (plus the order of the keys) are sent, for example when sorting the page or
+        refreshing mostly unchanged data. Without unique row keys, all rows are sent.
+
+        Subscribed to `changes`, the table fetches the current page again when the data changes.
+        Changes are coalesced to at most one refresh per `refresh_interval` and a table of a
+        disconnected client (or hidden table) waits until it is shown again. Changes of rows that
+        are not on the current page only invalidate the cache.
+
         Args:
-            fetch_rows_and_count (Callable[ [int, int, str], tuple[list[dict[str, Any]], int] ]): function that fetches rows and total row count
+            fetch_rows_and_count (Callable[[PageArgs], tuple[list[dict[str, Any]], int | None]]): (async) function that fetches rows and total row count
+            fetch_count (Callable[[PageArgs], int], optional): (async) function that counts the rows. Defaults to None.
+            estimated_count (bool, optional): whether the total row count is an estimate. Defaults to False.
             columns (list[dict], optional): list of column objects (defaults to the columns of the first row)
             column_defaults (dict, optional): optional default column properties
             row_key (str, optional): name of the column containing unique data identifying the row. Defaults to "id".
@@ -69,19 +627,41 @@ class Table(ui.table):
             pagination (int | dict): a dictionary correlating to a pagination object or number of rows per page (default: `10`)
             on_select (Handler[TableSelectionEventArguments], optional): callback which is invoked when the selection changes. Defaults to None.
             on_pagination_change (Handler[ValueChangeEventArguments], optional): callback which is invoked when the pagination changes. Defaults to None.
+            cache (PageCache, optional): cache for fetched pages. Defaults to None.
+            prefetch (bool, optional): whether to fetch the previous and next page in advance. Defaults to False.
+            filter_debounce (float, optional): seconds to wait for further filter changes before fetching. Defaults to 0.3.
+            keyset (bool, optional): whether to use keyset pagination for next/previous page. Defaults to False.
+            stream_rows (Callable[[PageArgs], Iterable[dict[str, Any]]], optional): (async) generator function yielding all rows for `All`. Defaults to None.
+            stream_chunk_size (int, optional): number of rows sent to the client at once when streaming. Defaults to 1000.
+            delta_rows (bool, optional): whether to only send the rows that changed. Defaults to True.
+            changes (DataChanges | None, optional): signal of changed data to refresh on. Defaults to None.
+            refresh_interval (float, optional): minimum seconds between refreshes caused by `changes`. Defaults to 1.0.
         """
         self.fetch_rows_and_count = fetch_rows_and_count
-
-        rows, total = fetch_rows_and_count(
-            PageArgs(
-                limit=pagination["rowsPerPage"]
-                if isinstance(pagination, dict)
-                else pagination,
-                offset=0,
-            )
+        self.fetch_count = fetch_count
+        self.estimated_count: bool = estimated_count
+        self._count: tuple[tuple, int] | None = None
+        self.cache: PageCache | None = (
+            PageCache() if cache is None and prefetch else cache
         )
+        self.prefetch: bool = prefetch
+        self.filter_debounce: float = filter_debounce
+        self.keyset: bool = keyset
+        self.stream_rows = stream_rows
+        self.stream_chunk_size: int = stream_chunk_size
+        self.delta_rows: bool = delta_rows
+        self.changes = changes
+        self.refresh_interval: float = refresh_interval
+        self._refresh_task: asyncio.Task | None = None
+        self._last_refresh: float = 0
+        self._keyset_page: tuple[int, PageArgs, tuple, tuple] | None = None
+        self._fetch_task: asyncio.Task | None = None
+        self._requested: dict = {}  # pagination of the latest requested page
+        self._filter_task: asyncio.Task | None = None
+        self._infer_columns: bool = columns is None
+
         super().__init__(
-            rows=rows,
+            rows=[],
             columns=columns,
             column_defaults=column_defaults,
             row_key=row_key,
@@ -94,25 +674,285 @@ class Table(ui.table):
 
         self.props("binary-state-sort")
         self.filter: str = ""
-        self.props["pagination"]["rowsNumber"] = total
+        self.props["pagination"]["rowsNumber"] = 0
         self.on("request", self.do_server_side_pagination)
+        if changes is not None:
+            changes.subscribe(self._handle_data_change)
+
+        self.request_page(
+            {"page": 1, "sortBy": None, "descending": False} | self.props["pagination"]
+        )
 
     def do_server_side_pagination(self, e: events.GenericEventArguments):
         """function to get new rows `fetch_rows_and_count` via on pagination"""
-        new_pagination = e.args["pagination"]
-
-        limit = int(new_pagination.get("rowsPerPage"))
-        offset = (int(new_pagination.get("page")) - 1) * limit
-        rows, total = self.fetch_rows_and_count(
-            PageArgs(
-                offset=offset,
-                limit=limit,
-                sort_by=new_pagination["sortBy"],
-                descending=new_pagination["descending"],
-                filter=self.filter,
+        self.request_page(e.args["pagination"])
+
+    def request_page(self, pagination: dict) -> None:
+        """Fetch the rows of `pagination` in the background.
+
+        A fetch that is still running is cancelled, so only the latest page is shown.
+
+        Args:
+            pagination (dict): Quasar pagination object of the page to show.
+        """
+        self._requested = dict(pagination)
+        if self._fetch_task is not None and not self._fetch_task.done():
+            self._fetch_task.cancel()
+        self._fetch_task = background_tasks.create(
+            self._fetch_page(pagination), name=f"ssp_table {self.id} fetch"
+        )
+
+    def _page_args(self, pagination: dict) -> PageArgs:
+        """Arguments for `fetch_rows_and_count` to get the page of `pagination`."""
+        page = int(pagination.get("page"))
+        limit = int(pagination.get("rowsPerPage"))
+        page_args = PageArgs(
+            offset=(page - 1) * limit,
+            limit=limit,
+            sort_by=pagination.get("sortBy"),
+            descending=bool(pagination.get("descending")),
+            filter=self.filter,
+        )
+
+        if self.keyset and self._keyset_page is not None:
+            shown_page, shown_args, first, last = self._keyset_page
+            if replace(page_args, offset=shown_args.offset) == shown_args:
+                if page == shown_page + 1:
+                    page_args.after = last
+                elif page == shown_page - 1 and page > 1:
+                    page_args.before = first
+        return page_args
+
+    def _row_cursor(self, row: dict[str, Any], sort_by: str | None) -> tuple:
+        if sort_by is None:
+            return (row[self.row_key],)
+        return (row.get(sort_by), row[self.row_key])
+
+    async def _fetch_page(self, pagination: dict) -> None:
+        page_args = self._page_args(pagination)
+        offset, limit = page_args.offset, page_args.limit
+        if limit == 0 and self.stream_rows is not None:
+            await self._stream_page(pagination, page_args)
+            return
+
+        self._set_loading(True)
+        try:
+            result, count = await asyncio.gather(
+                self._fetch_rows(page_args), self._fetch_count(page_args)
+            )
+        finally:
+            if self._fetch_task is asyncio.current_task():
+                self._set_loading(False)
+
+        if self._fetch_task is not asyncio.current_task() or result is None:
+            return  # another page was requested meanwhile (or the app is stopping)
+        rows, total = result
+        if self.fetch_count is not None:
+            total = count
+        total = self._complete_count(total, offset, limit, rows)
+
+        if self._infer_columns and rows:
+            self._infer_columns = False
+            self.columns = [
+                {"name": key, "label": str(key).upper(), "field": key, "sortable": True}
+                for key in rows[0]
+            ]
+
+        pagination["rowsNumber"] = total
+        self._update_page(rows, pagination)
+
+        if self.keyset and rows and limit > 0:
+            self._keyset_page = (
+                int(pagination["page"]),
+                replace(page_args, after=None, before=None),
+                self._row_cursor(rows[0], page_args.sort_by),
+                self._row_cursor(rows[-1], page_args.sort_by),
+            )
+
+        if self.prefetch and limit > 0:
+            page = int(pagination["page"])
+            for prefetch_page in (page - 1, page + 1):
+                if 0 <= (prefetch_page - 1) * limit < total:
+                    background_tasks.create(
+                        self.cache.fetch(
+                            self._page_args(pagination | {"page": prefetch_page}),
+                            self.fetch_rows_and_count,
+                        ),
+                        name=f"ssp_table {self.id} prefetch",
+                    )
+
+    def _can_send_delta(self) -> bool:
+        return self.delta_rows and self.client.has_socket_connection
+
+    def _set_loading(self, loading: bool) -> None:
+        if self._can_send_delta():
+            with suspend_updates(self):
+                self.props["loading"] = loading
+            self._run_props_javascript(f"props.loading = {dumps(loading)};")
+        else:
+            self.props["loading"] = loading
+            self.update()
+
+    def _update_page(self, rows: list[dict[str, Any]], pagination: dict) -> None:
+        """Show `rows`, only sending the rows that are not on the client already (if possible)."""
+        shown = {row.get(self.row_key): row for row in self.rows}
+        keys = [row.get(self.row_key) for row in rows]
+        if (
+            not self._can_send_delta()
+            or len(shown) < len(self.rows)
+            or None in keys
+            or len(set(keys)) < len(keys)
+        ):
+            self.props["pagination"].update(pagination)
+            self.update_rows(rows)
+            return
+
+        changed = [[key, row] for key, row in zip(keys, rows) if shown.get(key) != row]
+        same_keys = keys == [row[self.row_key] for row in self.rows]
+        same_pagination = (
+            self.props["pagination"] == self.props["pagination"] | pagination
+        )
+        code = ""
+        if changed or not same_keys:
+            code += (
+                f"const changed = new Map({dumps(changed)}); "
+                f"const shown = new Map(props.rows.map(row => [row[{dumps(self.row_key)}], row])); "
+                f"props.rows = {dumps(keys)}.map(key => changed.get(key) ?? shown.get(key)); "
+            )
+        if not same_pagination:
+            code += f"Object.assign(props.pagination, {dumps(pagination)}); "
+        if self.selected:
+            code += "props.selected = []; "
+        with suspend_updates(self):
+            self.props["pagination"].update(pagination)
+            self.rows[:] = rows
+            self.selected.clear()
+        if code:
+            self._run_props_javascript(code)
+
+    def _run_props_javascript(self, code: str) -> AwaitableResponse:
+        """Run `code` with the props of this table (`props`) on the client.
+
+        Used to change props without sending all of them (like the rows) again.
+        """
+        return self.client.run_javascript(
+            f"const props = mounted_app.elements[{self.id}].props; {code}",
+            timeout=30,
+        )
+
+    async def _stream_page(self, pagination: dict, page_args: PageArgs) -> None:
+        await self.client.connected()
+        self.props["pagination"].update(pagination | {"rowsNumber": 0})
+        self.props["loading"] = True
+        self.update_rows([])
+
+        async for chunk in _chunks(self.stream_rows(page_args), self.stream_chunk_size):
+            with suspend_updates(self):
+                self.rows.extend(chunk)
+                self.props["pagination"]["rowsNumber"] = len(self.rows)
+            await self._run_props_javascript(
+                f"props.rows.push(...{dumps(chunk)}); "
+                f"props.pagination.rowsNumber = {len(self.rows)};"
             )
+
+        with suspend_updates(self):
+            self.props["loading"] = False
+        self._run_props_javascript("props.loading = false;")
+
+    async def _fetch_rows(self, page_args: PageArgs) -> Any:
+        if self.cache is not None:
+            return await self.cache.fetch(page_args, self.fetch_rows_and_count)
+        return await _call(self.fetch_rows_and_count, page_args)
+
+    async def _fetch_count(self, page_args: PageArgs) -> int | None:
+        """Total row count from `fetch_count`, which is only called if the count key changed."""
+        if self.fetch_count is None:
+            return None
+        key = page_args.count_key()
+        if self._count is None or self._count[0] != key:
+            count = await _call(self.fetch_count, page_args)
+            if count is None:
+                return None
+            self._count = (key, count)
+        return self._count[1]
+
+    def _complete_count(
+        self, total: int | None, offset: int, limit: int, rows: list
+    ) -> int:
+        """Fill in an unknown total or correct an estimated one with the fetched page."""
+        if total is not None and not self.estimated_count:
+            return total
+
+        loaded = offset + len(rows)
+        if limit == 0 or len(rows) < limit:
+            total = loaded  # last page
+        elif total is None or total <= loaded:
+            total = loaded + 1  # at least one more page
+
+        if self._count is not None:
+            self._count = (self._count[0], total)
+        return total
+
+    def _handle_filter_change(self, filter_: str) -> None:
+        """Fetch the first page with the new filter (debounced).
+
+        The filter is not sent to the client, as QTable would request a page on every change.
+        """
+        if self._fetch_task is None:
+            return  # the first page is not requested yet and uses the current filter
+
+        for task in (self._filter_task, self._fetch_task):
+            if task is not None and not task.done():
+                task.cancel()
+        self._filter_task = background_tasks.create(
+            self._apply_filter(), name=f"ssp_table {self.id} filter"
         )
 
-        new_pagination["rowsNumber"] = total
-        self.props["pagination"].update(new_pagination)
-        self.update_rows(rows)
+    async def _apply_filter(self) -> None:
+        await asyncio.sleep(self.filter_debounce)
+        self.request_page(dict(self.props["pagination"]) | {"page": 1})
+
+    def _handle_data_change(self, keys: set | None) -> None:
+        if keys is None:
+            self._count = None  # rows may have been inserted or deleted
+        if self.cache is not None:
+            self.cache.invalidate()
+        if keys is not None and keys.isdisjoint(
+            row.get(self.row_key) for row in self.rows
+        ):
+            return  # the current page is not affected
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = background_tasks.create(
+                self._refresh(), name=f"ssp_table {self.id} refresh"
+            )
+
+    async def _refresh(self) -> None:
+        """Fetch the current page (or the one still loading) once the interval passed and the table is shown."""
+        delay = self._last_refresh + self.refresh_interval - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        while not (self.client.has_socket_connection and self.visible):
+            await asyncio.sleep(self.refresh_interval)
+        self._last_refresh = time.monotonic()
+        self.request_page(self._requested)
+
+    @override
+    def _handle_delete(self) -> None:
+        if self.changes is not None:
+            self.changes.unsubscribe(self._handle_data_change)
+        for task in (self._refresh_task, self._filter_task, self._fetch_task):
+            if task is not None and not task.done():
+                task.cancel()
+        return super()._handle_delete()
+
+    def invalidate_cache(self, *, refresh: bool = True) -> None:
+        """Remove all cached pages and the cached row count.
+
+        Args:
+            refresh (bool, optional): whether to fetch the current page (or the one still loading) again. Defaults to True.
+        """
+        self._count = None
+        if self.cache is not None:
+            self.cache.invalidate()
+        if refresh:
+            self.request_page(self._requested)
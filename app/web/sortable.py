@@ -3,7 +3,7 @@ import random
 from nicegui import APIRouter, ui
 
 from app.custom import sortable
-from app.custom.binds import ListBind
+from app.custom.binds import ListBind, ObservableListBind
 
 router = APIRouter(prefix="/sortable")
 
@@ -95,6 +95,8 @@ def sortable_example():
     ui.button("refresh").on_click(lambda: ui.navigate.to(sortable_refresh))
     ui.button("groups").on_click(lambda: ui.navigate.to(sortable_group))
     ui.button("dropzone").on_click(lambda: ui.navigate.to(sortable_dropzone))
+    ui.button("multidrag").on_click(lambda: ui.navigate.to(sortable_multidrag))
+    ui.button("virtual").on_click(lambda: ui.navigate.to(sortable_virtual))
     ui.button("all").on_click(lambda: ui.navigate.to(sortable_all))
     ui.button("trello_cards").on_click(lambda: ui.navigate.to(trello_example))
 
@@ -138,6 +140,7 @@ def sortable_updates():
         sort1.update()
 
     list1 = ListBind([{"label": str(i)} for i in range(3)])
+    list2 = ObservableListBind([{"label": str(i)} for i in range(3)])
 
     with ui.card():
         ui.label("sort1")
@@ -149,6 +152,19 @@ def sortable_updates():
             "Add a random number to start of list"
         )
 
+    with ui.card():
+        ui.label("sort2 (bound to list2 via bind_list)")
+        sortable.Row(class_obj=Custom, group="a").bind_list(list2)
+
+    with ui.row():
+        ui.button("pop", on_click=lambda: list2.pop(0)).tooltip(
+            "Pop first element of list2"
+        )
+        ui.button(
+            "append",
+            on_click=lambda: list2.append({"label": f"{random.randint(0, 100)}"}),
+        ).tooltip("Append a random number to list2")
+
 
 @router.page("/disabled")
 def sortable_disabled():
@@ -238,6 +254,50 @@ def sortable_dropzone():
         ui.label("Try the left most spot (marked with a border)")
 
 
+@router.page("/multidrag")
+def sortable_multidrag():
+    list1 = ListBind([{"label": str(i)} for i in range(10)])
+    list2 = ListBind([{"label": str(i)} for i in range(20, 25)])
+
+    ui.label("Click on items to select them, then drag one of them to move all.")
+    with ui.row():
+        with ui.card():
+            ui.label("sort1")
+            sortable.Column(
+                value=list1.value, class_obj=Custom, group="a", multi_drag=True
+            )
+
+        with ui.card():
+            ui.label("sort2")
+            sortable.Column(
+                value=list2.value, class_obj=Custom, group="a", multi_drag=True
+            )
+
+
+@router.page("/virtual")
+def sortable_virtual():
+    list1 = ListBind([{"label": str(i)} for i in range(50_000)])
+    list2 = ListBind([{"label": str(i)} for i in range(100_000, 100_010)])
+    item_template = """
+        <q-item class="bg-white rounded shadow-1 q-mb-xs">
+            <q-item-section>{{ props.item.label }}</q-item-section>
+        </q-item>
+    """
+
+    with ui.row():
+        with ui.card():
+            ui.label("50k items")
+            sortable.VirtualColumn(
+                value=list1.value, item_template=item_template, group="a"
+            ).classes("w-48")
+
+        with ui.card():
+            ui.label("10 items")
+            sortable.VirtualColumn(
+                value=list2.value, item_template=item_template, group="a"
+            ).classes("w-48")
+
+
 class TrelloCard(ui.card):
     def __init__(self, *, label: str) -> None:
         super().__init__(align_items=None)